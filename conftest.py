@@ -0,0 +1 @@
+# makes the repository root importable, so plain pytest finds maze4d
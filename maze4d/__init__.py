@@ -0,0 +1,12 @@
+"""
+4D Maze game
+
+maze4d.scene is the headless maze model and geometry, it only needs NumPy.
+maze4d.render is the pyglet renderer and is not imported here.
+"""
+
+from .constants import FPS, STEP, BLOCK_BIT, VISIT_BIT
+from .controls import DEFAULT_KEYMAP, HELD_ACTIONS, readKeymap
+from .scene import MazeScene, QUADS, TRIANGLES
+from .timing import PhaseTimer
+from .tracing import TRACER, Tracer
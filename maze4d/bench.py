@@ -0,0 +1,280 @@
+"""
+Benchmarks for maze generation, solving, meshing and map building
+
+Runs headless on maze4d.scene, no window or GL context is needed.
+
+USAGE:
+    python -m maze4d.bench                          # sizes 5 10 20 40
+    python -m maze4d.bench --sizes 5 10 50x50x50x4 --out results.json
+    python -m maze4d.bench --compare base.json --threshold 0.2
+
+With --compare the medians are checked against an earlier results file and
+the exit status is 1 if any benchmark got slower by more than the threshold.
+With --kernels the searches are also timed on every kernel backend that
+can run here, see maze4d.kernels, with the time of their first call.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+# installed
+import numpy as np
+# local
+from . import kernels
+from .constants import DEFAULT_SEED
+from .scene import MazeScene, parseSize, sizeName, prepareScene
+
+################################################################################
+# BENCHMARKS
+
+DEFAULT_SIZES = ['5', '10', '20', '40']
+MIN_SAMPLE_TIME = 0.02 # seconds, short functions are looped up to this
+
+
+def benchBuildMaze(scene, size, seed):
+    scene.random.seed(seed)
+    return lambda: scene.buildMaze(size)
+
+
+def benchSolveMaze(scene, size, seed):
+    prepareScene(scene, size, seed)
+    maze = scene.maze.copy()
+    def run():
+        scene.maze[...] = maze
+        scene.solveMaze()
+    return run
+
+
+def benchFloodFill(scene, size, seed):
+    prepareScene(scene, size, seed)
+    return lambda: kernels.floodFill(scene.openMask, scene.position)
+
+
+def benchShortestPath(scene, size, seed):
+    prepareScene(scene, size, seed)
+    return scene.shortestPath
+
+
+def benchSection(crossSection, reachableOnly=False):
+    def bench(scene, size, seed):
+        prepareScene(scene, size, seed)
+        scene.crossSection = crossSection
+        scene.smoothSlice = False
+        scene.reachableOnly = reachableOnly
+        scene.levelOfDetail = False
+        return scene.generateMaze
+    return bench
+
+
+def benchDetailSection(scene, size, seed):
+    # a new slice, no chunk meshes kept yet
+    prepareScene(scene, size, seed)
+    scene.crossSection = 3
+    scene.smoothSlice = False
+    scene.reachableOnly = False
+    scene.levelOfDetail = True
+    def bench():
+        scene.detailCache = None
+        scene.generateMaze()
+    return bench
+
+
+def benchVisibleChunks(scene, size, seed):
+    prepareScene(scene, size, seed)
+    scene.generateMaze()
+    aspect = scene.mazeWidth/float(scene.mazeHeight)
+    return lambda: scene.visibleMazeChunks(aspect)
+
+
+def benchGenerateOverview(scene, size, seed):
+    prepareScene(scene, size, seed)
+    return scene.generateOverview
+
+
+def benchGenerateMap(scene, size, seed):
+    prepareScene(scene, size, seed)
+    return scene.generateMap
+
+
+def benchGenerateHint(scene, size, seed):
+    prepareScene(scene, size, seed)
+    scene.hint = True
+    return scene.generateHint
+
+
+# name -> setup(scene, size, seed) returning the function to time
+BENCHMARKS = {'buildMaze'           : benchBuildMaze,
+              'solveMaze'           : benchSolveMaze,
+              'floodFill'           : benchFloodFill,
+              'shortestPath'        : benchShortestPath,
+              'generate1DSection'   : benchSection(1),
+              'generate2DSection'   : benchSection(2),
+              'generate3DSection'   : benchSection(3),
+              'generate3DReachable' : benchSection(3, reachableOnly=True),
+              'generate3DDetail'    : benchDetailSection,
+              'visibleMazeChunks'   : benchVisibleChunks,
+              'generateOverview'    : benchGenerateOverview,
+              'generateMap'         : benchGenerateMap,
+              'generateHint'        : benchGenerateHint,
+              }
+
+# benchmarks of maze4d.kernels searches, run on every backend by --kernels
+KERNEL_BENCHMARKS = ('solveMaze', 'floodFill', 'shortestPath')
+
+
+def timeFunction(function, repeat):
+    # seconds per call, each sample loops the function for MIN_SAMPLE_TIME
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_TIME:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start)/number)
+    return {'min'    : min(samples),
+            'median' : float(np.median(samples)),
+            'mean'   : float(np.mean(samples)),
+            'repeat' : repeat,
+            'number' : number,
+            }
+
+
+def runBenchmarks(sizes, names=None, repeat=5, seed=DEFAULT_SEED, log=print):
+    # returns benchmark[size] -> timing statistics (seconds)
+    scene = MazeScene()
+    results = {}
+    for size in sizes:
+        for name in (names or BENCHMARKS):
+            key = '{}[{}]'.format(name, sizeName(size))
+            run = BENCHMARKS[name](scene, size, seed)
+            results[key] = timeFunction(run, repeat)
+            if log:
+                log('{:<32}{:12.3f} ms'.format(key, 1000*results[key]['median']))
+    return results
+
+
+def compareKernels(sizes, repeat=5, seed=DEFAULT_SEED, log=print):
+    # returns benchmark[size] -> backend -> timing statistics (seconds),
+    # with 'first' the first call, which for a compiled backend includes
+    # loading or compiling it
+    scene = MazeScene()
+    backend = kernels.backend
+    results = {}
+    if log:
+        log('{:<32}'.format('kernels') + ''.join('{:>12}{:>12}'.format(name + ' ms', 'first ms')
+                                                 for name in kernels.BACKENDS))
+    for size in sizes:
+        for name in KERNEL_BENCHMARKS:
+            key = '{}[{}]'.format(name, sizeName(size))
+            results[key] = {}
+            for backendName in kernels.BACKENDS:
+                kernels.setBackend(backendName)
+                run = BENCHMARKS[name](scene, size, seed)
+                start = time.perf_counter()
+                run()
+                first = time.perf_counter() - start
+                results[key][backendName] = timeFunction(run, repeat)
+                results[key][backendName]['first'] = first
+            if log:
+                log('{:<32}'.format(key) + ''.join('{:12.3f}{:12.3f}'.format(1000*stats['median'], 1000*stats['first'])
+                                                   for stats in results[key].values()))
+    kernels.setBackend(backend)
+    return results
+
+
+def gitCommit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(seed):
+    return {'commit'   : gitCommit(),
+            'time'     : time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python'   : platform.python_version(),
+            'numpy'    : np.__version__,
+            'platform' : platform.platform(),
+            'seed'     : seed,
+            'kernels'  : kernels.backend,
+            }
+
+
+def compareResults(base, results, threshold):
+    # prints median ratios, returns the benchmarks slower than 1+threshold
+    regressions = []
+    print('{:<32}{:>12}{:>12}{:>8}'.format('benchmark', 'base ms', 'ms', 'ratio'))
+    for key, stats in results.items():
+        if key not in base:
+            continue
+        ratio = stats['median']/base[key]['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        print('{:<32}{:12.3f}{:12.3f}{:8.2f}{}'.format(key,
+                                                       1000*base[key]['median'],
+                                                       1000*stats['median'],
+                                                       ratio,
+                                                       flag))
+    return regressions
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze benchmarks')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='maze sizes, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--bench', nargs='+', choices=list(BENCHMARKS),
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per benchmark (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='maze seed (default: %(default)s)')
+    parser.add_argument('--out', metavar='PATH',
+                        help='write JSON results to PATH')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare against earlier JSON results')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown for --compare (default: %(default)s)')
+    parser.add_argument('--kernels', action='store_true',
+                        help='also compare the kernel backends on the searches')
+    args = parser.parse_args(argv)
+
+    sizes = [parseSize(s) for s in args.sizes]
+    results = runBenchmarks(sizes, args.bench, args.repeat, args.seed)
+    output = {'meta': metadata(args.seed), 'results': results}
+    if args.kernels:
+        print()
+        output['kernels'] = compareKernels(sizes, args.repeat, args.seed)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(output, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)['results']
+        if compareResults(base, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+4D Maze game constants
+"""
+
+from math import pi
+
+################################################################################
+# GAME CONSTANTS
+
+FPS = 30.0
+STEP = 1/FPS      # fixed simulation timestep
+MAX_STEPS = 5     # simulation steps to catch up after a stall
+FOV = 60.0
+NEAR = 0.1
+FAR = 100.0
+CHUNK_SIZE = 8    # cells along each side of a culled mesh chunk
+LOD_RADIUS = 8.0  # cells around the player meshed in full detail
+HISTORY_SIZE = 4096 # undoable moves, swaps and cross-section changes kept
+TRAIL_SIZE = 64   # cells left behind shown as a trail
+TURNING = 90.0
+DEG = pi/180.0
+
+################################################################################
+# MAZE CONSTANTS
+
+BLOCK_BIT = 1 # 2^0
+VISIT_BIT = 2 # 2^1
+MAX_FILTER_TRIES = 1000 # mazes built before a maze filter is given up
+DEFAULT_SEED = 0 # seed of the headless tools, see maze4d.bench
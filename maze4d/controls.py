@@ -0,0 +1,71 @@
+"""
+Game actions and their default keys
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from configparser import ConfigParser
+
+################################################################################
+# CONTROLS
+
+# action -> default keys (names as in pyglet.window.key)
+DEFAULT_KEYMAP = {'x+'                     : ['W'],
+                  'x-'                     : ['S'],
+                  'y+'                     : ['A'],
+                  'y-'                     : ['D'],
+                  'z+'                     : ['E'],
+                  'z-'                     : ['Q'],
+                  'w+'                     : ['Z'],
+                  'w-'                     : ['C'],
+                  'exclude x'              : ['1'],
+                  'exclude y'              : ['2'],
+                  'exclude z'              : ['3'],
+                  'exclude w'              : ['4'],
+                  'cross-sections'         : ['G'],
+                  'previous cross-section' : [],
+                  'smooth cross-section'   : ['V'],
+                  'reachable walls only'   : ['R'],
+                  'multi-view'             : ['M'],
+                  'level of detail'        : ['L'],
+                  'overview'               : ['O'],
+                  'hints'                  : ['H'],
+                  'trail'                  : ['T'],
+                  'undo'                   : ['BACKSPACE'],
+                  'rewind'                 : ['HOME'],
+                  'fullscreen'             : ['F11'],
+                  'regenerate'             : ['SPACE'],
+                  'timing overlay'         : ['F3'],
+                  'export timings'         : ['F4'],
+                  'turn right'             : ['RIGHT'],
+                  'turn left'              : ['LEFT'],
+                  'turn up'                : ['UP'],
+                  'turn down'              : ['DOWN'],
+                  }
+
+# actions applied every tick while their key is held
+HELD_ACTIONS = ('turn right',
+                'turn left',
+                'turn up',
+                'turn down',
+                )
+
+
+def readKeymap(path=None):
+    # [keys] section of the config file, one action per line:
+    #     x+ = W, UP
+    # returns action -> key names, defaults for anything not configured
+    keymap = dict(DEFAULT_KEYMAP)
+    if path is None:
+        return keymap
+    config = ConfigParser()
+    config.read(path)
+    if config.has_section('keys'):
+        for action, names in config.items('keys'):
+            if action not in DEFAULT_KEYMAP:
+                print('unknown action in {}: {}'.format(path, action))
+                continue
+            keymap[action] = [n.strip() for n in names.split(',') if n.strip()]
+    return keymap
@@ -0,0 +1,150 @@
+"""
+Spatial chunks of a mesh, view-frustum culling of them and their
+back-to-front drawing order
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from math import tan
+# installed
+import numpy as np
+# local
+from .constants import DEG, CHUNK_SIZE
+
+################################################################################
+# CHUNKS
+
+# A mesh is split into chunks of CHUNK_SIZE^3 cells, by the cell of each
+# block or the first vertex of each primitive. Primitives of one chunk are
+# made contiguous, keeping their order, so a chunk is drawn as one range of
+# vertices. Primitives are at most one cell across, so a chunk's box is its
+# cells grown by one cell on every side.
+
+def chunkIndex(points, size=CHUNK_SIZE):
+    # chunk of each of (n, 3) points as an int, in x, y, z order, and the
+    # lowest chunk and chunks along each axis to turn it back into a corner
+    keys = (points//size).astype('int32')
+    low = keys.min(axis=0)
+    keys -= low
+    span = keys.max(axis=0) + 1
+    index = (keys[:,0]*span[1] + keys[:,1])*span[2] + keys[:,2]
+    # a small int type lets the stable sort be a radix sort
+    if span.prod() <= 2**16:
+        index = index.astype('uint16')
+    return index, low, span
+
+
+def chunkRanges(index, vertexCounts, low, span, size=CHUNK_SIZE):
+    # first vertex, vertex count and (n, 2, 3) box of every chunk, given the
+    # sorted chunk index and vertex count of each block or primitive
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    counts = np.add.reduceat(vertexCounts, starts)
+    first = np.cumsum(counts) - counts
+    keys = np.array(np.unravel_index(index[starts], span)).T + low
+    boxes = np.stack([keys*size - 1, (keys + 1)*size + 1], axis=1).astype('float32')
+    drawn = counts > 0
+    return first[drawn].astype('int32'), counts[drawn].astype('int32'), boxes[drawn]
+
+
+def noChunks():
+    return np.zeros(0, 'int32'), np.zeros(0, 'int32'), np.zeros((0,2,3), 'float32')
+
+
+def chunkMesh(vertices, colors, mode, size=CHUNK_SIZE):
+    # returns the reordered vertices and colors, first vertex and vertex count
+    # of every chunk, and chunk boxes as (n, 2, 3) low/high corners
+    if not len(vertices):
+        return (vertices, colors) + noChunks()
+    index, low, span = chunkIndex(vertices[::mode], size)
+    order = np.argsort(index, kind='stable')
+    vertices = vertices.reshape(-1, mode, 3)[order].reshape(-1,3)
+    colors = colors.reshape(-1, mode, 4)[order].reshape(-1,4)
+    counts = np.full(len(order), mode)
+    return (vertices, colors) + chunkRanges(index[order], counts, low, span, size)
+
+
+################################################################################
+# FRUSTUM
+
+def frustumPlanes(eye, center, up, fov, aspect, near, far):
+    # planes of a gluPerspective/gluLookAt view as (6, 4) rows a, b, c, d,
+    # a point p is inside when a*x + b*y + c*z + d >= 0 for every plane
+    eye = np.asarray(eye, 'float')
+    forward = np.asarray(center, 'float') - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    top = np.cross(side, forward)
+    tanY = tan(fov*DEG/2)
+    tanX = tanY*aspect
+    normals = np.array([ forward,               # near
+                        -forward,               # far
+                         side + tanX*forward,   # left
+                        -side + tanX*forward,   # right
+                         top  + tanY*forward,   # bottom
+                        -top  + tanY*forward,   # top
+                        ])
+    offsets = -normals @ eye
+    offsets[0] -= near
+    offsets[1] += far
+    return np.column_stack([normals, offsets])
+
+
+def visibleBoxes(boxes, planes):
+    # which (n, 2, 3) boxes are at least partly inside all planes, testing
+    # the corner of each box furthest along each plane's normal
+    if not len(boxes):
+        return np.zeros(0, bool)
+    normals = planes[:,:3]
+    corners = np.where(normals > 0, boxes[:,None,1], boxes[:,None,0])
+    return ((corners*normals).sum(axis=2) + planes[:,3] >= 0).all(axis=1)
+
+
+################################################################################
+# DRAWING ORDER
+
+# Transparent walls look right when drawn back to front. Sorting the mesh
+# every frame is too slow, but the back-to-front order of axis-aligned cells
+# only depends on which side of the maze the eye is along each axis, or,
+# along an axis the eye is level with the maze, roughly where. The eye is
+# snapped to a bucket point: one cell outside the maze, or the middle of its
+# chunk when level with it. One order is built per bucket, by the distance
+# along the axes (L1) to that point, and kept until the eye moves into
+# another bucket.
+
+def viewBucket(eye, low, high, size=CHUNK_SIZE):
+    # bucket point of an eye, for a mesh in the box low to high
+    return tuple(low[k] - 1.0 if eye[k] < low[k] else
+                 high[k] + 1.0 if eye[k] > high[k] else
+                 size*(eye[k]//size + 0.5)
+                 for k in range(3))
+
+
+def drawOrder(vertices, mode, first, count, boxes, bucket):
+    # vertex indices drawing a chunked mesh back to front from a bucket
+    # point: chunks by their centers, then the primitives of each chunk by
+    # their centers
+    # returns the indices, the chunks in drawing order and the first index
+    # of every chunk
+    if not len(vertices):
+        return np.zeros(0, 'uint32'), np.arange(len(boxes)), np.zeros(len(boxes), 'int')
+    # mode times the distance of each primitive's center
+    depth = 0
+    for k in range(3):
+        depth = depth + np.abs(sum(vertices[i::mode,k] for i in range(mode)) - mode*bucket[k])
+    # farthest first, to a quarter cell, as small ints for a radix sort
+    depth = np.round(4/mode*(depth.max() - depth))
+    if depth.max() < 2**16:
+        depth = depth.astype('uint16')
+    chunks = np.argsort(-np.abs(boxes.mean(axis=1) - bucket).sum(axis=1), kind='stable')
+    rank = np.empty(len(chunks), 'uint16' if len(chunks) <= 2**16 else 'int')
+    rank[chunks] = np.arange(len(chunks))
+    chunk = np.repeat(rank, count//mode)
+    order = np.argsort(depth, kind='stable')
+    order = order[np.argsort(chunk[order], kind='stable')]
+    indices = (mode*order.astype('uint32')[:,None] + np.arange(mode, dtype='uint32')).ravel()
+    firstIndex = np.empty(len(chunks), 'int')
+    firstIndex[chunks] = np.cumsum(count[chunks]) - count[chunks]
+    return indices, chunks, firstIndex
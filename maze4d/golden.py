@@ -0,0 +1,152 @@
+"""
+Golden-image check of the renderer
+
+Renders a fixed set of scenes offscreen (see maze4d.offscreen) and compares
+each with its reference PNG. Small rasterizer differences between GL
+drivers are tolerated: images are compared as luminance blurred over 3x3
+pixels, and a case passes while at most MAX_BAD_FRACTION of its pixels
+differ by more than PIXEL_THRESHOLD. The render time of every case is
+reported, split into building the scene and drawing it.
+
+USAGE:
+    python -m maze4d.golden --update                # write the references
+    python -m maze4d.golden                         # compare against them
+    python -m maze4d.golden --cases start overview --diff diffs
+    python -m pytest tests/test_golden.py           # the same check as tests
+
+The exit status is 1 if any case differs or has no reference.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import os
+import sys
+# installed
+import numpy as np
+# local
+from .offscreen import OffscreenRenderer, hiddenDims, readPng, writePng
+
+################################################################################
+# GOLDEN IMAGES
+
+# references next to the package, wherever the check is run from
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'golden')
+PIXEL_THRESHOLD  = 24    # luminance difference of a bad pixel, of 255
+MAX_BAD_FRACTION = 0.005 # bad pixels a case may have
+
+# name -> OffscreenRenderer.render arguments
+GOLDEN_CASES = {'start'      : dict(seed=1),
+                'hide x'     : dict(seed=1, d=hiddenDims(0)),
+                'hide z'     : dict(seed=1, d=hiddenDims(2)),
+                '2D section' : dict(seed=2, crossSection=2),
+                '1D section' : dict(seed=2, crossSection=1),
+                'turned'     : dict(seed=3, forward=(1, 2, -1), up=(0, 0, 1)),
+                'no hint'    : dict(seed=3, hint=False),
+                'smooth'     : dict(seed=4, smoothSlice=True),
+                'reachable'  : dict(seed=4, reachableOnly=True),
+                'detail'     : dict(seed=5, size=(20,20,20,4), levelOfDetail=True),
+                'large'      : dict(seed=5, size=(20,20,20,4)),
+                'multi-view' : dict(seed=6, multiView=True),
+                'overview'   : dict(seed=6, overview=True),
+                }
+
+
+def fileName(case):
+    return case.replace(' ', '_') + '.png'
+
+
+def blurredLuminance(image):
+    # luminance of an RGBA image, averaged over 3x3 pixels
+    luminance = image[...,:3].astype('float32') @ np.array([0.299, 0.587, 0.114], 'float32')
+    padded = np.pad(luminance, 1, mode='edge')
+    height, width = luminance.shape
+    return sum(padded[i:i+height, j:j+width] for i in range(3) for j in range(3))/9
+
+
+def compareImages(image, golden):
+    # fraction of bad pixels and their luminance differences, 1.0 if the
+    # sizes differ
+    if image.shape != golden.shape:
+        return 1.0, None
+    difference = np.abs(blurredLuminance(image) - blurredLuminance(golden))
+    return float((difference > PIXEL_THRESHOLD).mean()), difference
+
+
+def diffImage(difference):
+    # bad pixels red, other differences grey
+    image = np.full(difference.shape + (4,), 255, 'uint8')
+    shade = 255 - np.minimum(8*difference, 255).astype('uint8')
+    image[...,0] = shade
+    image[...,1] = shade
+    image[...,2] = shade
+    bad = difference > PIXEL_THRESHOLD
+    image[bad] = (255, 0, 0, 255)
+    return image
+
+
+def runCases(renderer, cases, directory, update=False, diffDirectory=None, log=print):
+    # renders every case, writing or comparing its golden image
+    # returns case -> result dict
+    results = {}
+    if log:
+        log('{:<12}{:>8}{:>10}{:>10}  {}'.format('case', 'bad', 'scene ms', 'draw ms', 'result'))
+    for case in cases:
+        image, sceneTime, drawTime = renderer.render(**GOLDEN_CASES[case])
+        path = os.path.join(directory, fileName(case))
+        bad = None
+        if update:
+            writePng(path, image)
+            status = 'written'
+        elif not os.path.exists(path):
+            status = 'MISSING'
+        else:
+            bad, difference = compareImages(image, readPng(path))
+            status = 'ok' if bad <= MAX_BAD_FRACTION else 'DIFFERS'
+            if status != 'ok' and diffDirectory:
+                writePng(os.path.join(diffDirectory, fileName(case)), image)
+                if difference is not None:
+                    writePng(os.path.join(diffDirectory, 'diff_' + fileName(case)), diffImage(difference))
+        results[case] = {'status'      : status,
+                         'badFraction' : bad,
+                         'sceneMs'     : 1000*sceneTime,
+                         'drawMs'      : 1000*drawTime,
+                         }
+        if log:
+            log('{:<12}{:>8}{:10.1f}{:10.1f}  {}'.format(case, '-' if bad is None else '{:.2%}'.format(bad),
+                                                        1000*sceneTime, 1000*drawTime, status))
+    return results
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze golden-image check')
+    parser.add_argument('--dir', default=DEFAULT_DIR,
+                        help='golden image directory (default: %(default)s)')
+    parser.add_argument('--cases', nargs='+', choices=list(GOLDEN_CASES), default=list(GOLDEN_CASES),
+                        help='cases to run (default: all)')
+    parser.add_argument('--update', action='store_true',
+                        help='write the golden images instead of comparing')
+    parser.add_argument('--diff', metavar='DIR',
+                        help='write renders and diff images of failed cases to DIR')
+    args = parser.parse_args(argv)
+
+    for directory in (args.dir if args.update else None, args.diff):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    renderer = OffscreenRenderer()
+    results = runCases(renderer, args.cases, args.dir, args.update, args.diff)
+    renderer.close()
+    failed = [case for case, result in results.items() if result['status'] not in ('ok', 'written')]
+    if failed:
+        print('{} of {} cases failed: {}'.format(len(failed), len(results), ', '.join(failed)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Undo history and breadcrumb trail of a play session
+
+Every undoable action is kept as a two-byte delta, its kind and a value:
+    MOVE          : open mask bit of the move, see maze4d.openmask
+    SWAP          : dimension hidden before the swap
+    CROSS_SECTION : step of cycleCrossSection
+and every cell the player left as its four coordinates. Both are kept in
+fixed-capacity rings, the oldest entries dropped once they are full.
+"""
+
+################################################################################
+# INCLUDES
+
+# installed
+import numpy as np
+
+################################################################################
+# HISTORY
+
+MOVE          = 0
+SWAP          = 1
+CROSS_SECTION = 2
+
+
+class History:
+    def __init__(self, capacity):
+        self.deltas = np.zeros((capacity, 2), 'int8')
+        # one past the newest delta, and deltas kept
+        self.end   = 0
+        self.count = 0
+
+
+    def __len__(self):
+        return self.count
+
+
+    def push(self, kind, value):
+        self.deltas[self.end] = kind, value
+        self.end = (self.end + 1)%len(self.deltas)
+        self.count = min(self.count + 1, len(self.deltas))
+
+
+    def pop(self):
+        # newest delta as (kind, value), None when empty
+        if not self.count:
+            return None
+        self.end = (self.end - 1)%len(self.deltas)
+        self.count -= 1
+        kind, value = self.deltas[self.end]
+        return int(kind), int(value)
+
+
+    def popAll(self):
+        # every delta as (n, 2) kinds and values, oldest first
+        deltas = self.deltas[(self.end - self.count + np.arange(self.count))%len(self.deltas)]
+        self.clear()
+        return deltas
+
+
+    def clear(self):
+        self.count = 0
+
+
+class Trail:
+    def __init__(self, capacity):
+        self.cells = np.zeros((capacity, 4), 'int16')
+        # one past the newest cell, and cells kept
+        self.end   = 0
+        self.count = 0
+
+
+    def __len__(self):
+        return self.count
+
+
+    def push(self, cell):
+        self.cells[self.end] = cell
+        self.end = (self.end + 1)%len(self.cells)
+        self.count = min(self.count + 1, len(self.cells))
+
+
+    def recent(self):
+        # kept cells as (n, 4), and the age of each, 0 for the newest
+        ages = np.arange(self.count)
+        return self.cells[(self.end - 1 - ages)%len(self.cells)], ages
+
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,180 @@
+"""
+Maze search kernels with an optional Numba backend
+
+The searches over the open mask, reaching cells and shortest routes, are
+loops over single cells that NumPy cannot vectorize. They come in two
+backends with the same results:
+    python : maze4d.openmask, always available
+    numba  : the same loops over arrays compiled with Numba, if installed,
+             cached in __pycache__ so they are only compiled once
+numba is used when installed, MAZE_KERNELS=python forces the fallback and
+setBackend switches at run time. numba itself is only imported on the
+first search of its backend, so importing maze4d stays fast. Callers look the kernels up on this
+module, kernels.floodFill(...), so a switch reaches them.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from importlib.util import find_spec
+import os
+# installed
+import numpy as np
+# local
+from . import openmask
+from .openmask import neighborOffsets
+
+################################################################################
+# NUMBA KERNELS
+
+KERNELS_ENV = 'MAZE_KERNELS'
+
+# numba once imported by loadNumba
+numba = None
+
+
+def reachLoop(flat, offsets, start, goal):
+    # openmask.floodFill on a flat mask, goal -1 for none
+    reached = np.zeros(flat.size, np.bool_)
+    reached[start] = True
+    stack = np.empty(flat.size, np.int64)
+    stack[0] = start
+    top = 1
+    while top:
+        top -= 1
+        cell = stack[top]
+        open = flat[cell]
+        for bit in range(8):
+            if open >> bit & 1:
+                neighbor = cell + offsets[bit]
+                if not reached[neighbor]:
+                    reached[neighbor] = True
+                    if neighbor == goal:
+                        return reached
+                    stack[top] = neighbor
+                    top += 1
+    return reached
+
+
+def traceLength(parent, cell):
+    length = 1
+    while parent[cell] != cell:
+        cell = parent[cell]
+        length += 1
+    return length
+
+
+def searchLoop(flat, offsets, start, goal):
+    # openmask.bidirectionalSearch on a flat mask, an empty route if the
+    # goal is not reachable
+    n = flat.size
+    if start == goal:
+        return np.full(1, start, np.int64)
+    parents = np.full((2, n), -1, np.int64)
+    parents[0, start] = start
+    parents[1, goal] = goal
+    frontiers = np.empty((2, n), np.int64)
+    frontiers[0, 0] = start
+    frontiers[1, 0] = goal
+    sizes = np.ones(2, np.int64)
+    grown = np.empty(n, np.int64)
+    meetings = np.empty(n, np.int64)
+    while sizes[0] and sizes[1]:
+        side = 0 if sizes[0] <= sizes[1] else 1
+        count = 0
+        met = 0
+        for k in range(sizes[side]):
+            cell = frontiers[side, k]
+            open = flat[cell]
+            for bit in range(8):
+                if open >> bit & 1:
+                    neighbor = cell + offsets[bit]
+                    if parents[side, neighbor] < 0:
+                        parents[side, neighbor] = cell
+                        if parents[1-side, neighbor] >= 0:
+                            meetings[met] = neighbor
+                            met += 1
+                        grown[count] = neighbor
+                        count += 1
+        if met:
+            # shortest of the routes through the meetings, the first if tied
+            best = meetings[0]
+            bestLength = n + 1
+            for m in range(met):
+                length = traceLength(parents[0], meetings[m]) + traceLength(parents[1], meetings[m])
+                if length < bestLength:
+                    best = meetings[m]
+                    bestLength = length
+            head = traceLength(parents[0], best)
+            route = np.empty(bestLength - 1, np.int64)
+            cell = best
+            for k in range(head - 1, -1, -1):
+                route[k] = cell
+                cell = parents[0, cell]
+            cell = best
+            for k in range(head, bestLength - 1):
+                cell = parents[1, cell]
+                route[k] = cell
+            return route
+        frontiers[side, :count] = grown[:count]
+        sizes[side] = count
+    return np.empty(0, np.int64)
+
+
+def loadNumba():
+    # compiles the loops on first use, searchLoop finds the compiled
+    # traceLength through this module
+    global numba, reachLoop, traceLength, searchLoop
+    if numba is None:
+        import numba as module
+        reachLoop   = module.njit(cache=True)(reachLoop)
+        traceLength = module.njit(cache=True)(traceLength)
+        searchLoop  = module.njit(cache=True)(searchLoop)
+        numba = module
+
+
+def numbaFloodFill(mask, start, goal=None):
+    loadNumba()
+    offsets = np.array(neighborOffsets(mask.shape), 'int64')
+    start = int(np.ravel_multi_index(start, mask.shape))
+    goal = -1 if goal is None else int(np.ravel_multi_index(goal, mask.shape))
+    return reachLoop(mask.ravel(), offsets, start, goal).reshape(mask.shape)
+
+
+def numbaBidirectionalSearch(mask, start, goal):
+    loadNumba()
+    offsets = np.array(neighborOffsets(mask.shape), 'int64')
+    start = int(np.ravel_multi_index(start, mask.shape))
+    goal  = int(np.ravel_multi_index(goal, mask.shape))
+    route = searchLoop(mask.ravel(), offsets, start, goal)
+    return route.tolist() if len(route) else None
+
+
+################################################################################
+# BACKENDS
+
+# name -> kernels, only backends that can run here
+BACKENDS = {'python' : {'floodFill'           : openmask.floodFill,
+                        'bidirectionalSearch' : openmask.bidirectionalSearch,
+                        },
+            }
+if find_spec('numba') is not None:
+    BACKENDS['numba'] = {'floodFill'           : numbaFloodFill,
+                         'bidirectionalSearch' : numbaBidirectionalSearch,
+                         }
+
+
+def setBackend(name):
+    # returns the backend in use, the python fallback if name is unavailable
+    global backend, floodFill, bidirectionalSearch
+    if name not in BACKENDS:
+        print('{} kernels are not available, using python'.format(name))
+        name = 'python'
+    backend = name
+    floodFill           = BACKENDS[name]['floodFill']
+    bidirectionalSearch = BACKENDS[name]['bidirectionalSearch']
+    return backend
+
+
+setBackend(os.environ.get(KERNELS_ENV, 'numba' if 'numba' in BACKENDS else 'python'))
@@ -0,0 +1,229 @@
+"""
+Load generator for maze4d.server
+
+Every connection opens its own sessions, then keeps a window of requests in
+flight on them: mostly moves in random directions, now and then a dimension
+swap or a state query. The report gives the requests per second and the
+latency distribution, each request timed from the write of its window to
+the arrival of its response.
+
+USAGE:
+    python -m maze4d.loadgen --spawn                # starts its own server
+    python -m maze4d.loadgen --connections 100 --sessions 50 --window 32
+    python -m maze4d.loadgen --unix /tmp/maze4d.sock --duration 30 --out load.json
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .constants import DEFAULT_SEED
+from .scene import parseSize, sizeName
+from .server import (DEFAULT_HOST, DEFAULT_PORT, REQUEST_DTYPE, RESPONSE_DTYPE, FRAME,
+                     NEW, MOVE, SWAP, STATE, CLOSE, STATUS_NAMES)
+
+################################################################################
+# LOAD
+
+# share of each op among the requests after the sessions are open
+OP_MIX = {MOVE  : 0.9,
+          SWAP  : 0.05,
+          STATE : 0.05,
+          }
+CONNECT_TIMEOUT = 10.0 # seconds to wait for a spawned server
+
+
+async def connect(host, port, unix, timeout=0.0):
+    # retries until the server listens or timeout passes
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if unix:
+                return await asyncio.open_unix_connection(unix)
+            return await asyncio.open_connection(host, port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def waitForServer(address, timeout):
+    reader, writer = await connect(*address, timeout=timeout)
+    writer.close()
+
+
+async def exchange(reader, writer, requests, sent):
+    # writes requests, returns their responses and the latency of each
+    sent[requests['tag']] = time.perf_counter()
+    writer.write(requests.tobytes())
+    data = b''
+    latencies = np.zeros(len(requests))
+    received = 0
+    while received < len(requests):
+        chunk = await reader.read(FRAME*len(requests) - len(data))
+        if not chunk:
+            raise ConnectionError('server closed the connection')
+        arrived = time.perf_counter()
+        data += chunk
+        frames = len(data)//FRAME
+        latencies[received:frames] = arrived - sent[requests['tag'][received:frames]]
+        received = frames
+    responses = np.frombuffer(data, RESPONSE_DTYPE)
+    if (responses['tag'] != requests['tag']).any():
+        raise ValueError('responses out of order')
+    return responses, latencies
+
+
+class LoadConnection:
+    # one connection and its sessions
+    def __init__(self, address, seed):
+        self.address = address
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        # send time of every tag
+        self.sent = np.zeros(2**16)
+        self.latencies = []
+        self.statuses = []
+
+
+    async def open(self, sessions, size):
+        self.reader, self.writer = await connect(*self.address)
+        requests = np.zeros(sessions, REQUEST_DTYPE)
+        requests['op'] = NEW
+        requests['tag'] = np.arange(sessions)
+        requests['seed'] = self.seed + np.arange(sessions)
+        requests['size'] = size
+        responses, _ = await exchange(self.reader, self.writer, requests, self.sent)
+        self.ids = responses['session'].copy()
+
+
+    async def play(self, window, deadline):
+        ops = np.array(list(OP_MIX))
+        mix = np.array(list(OP_MIX.values()))
+        tag = 0
+        while time.perf_counter() < deadline:
+            requests = np.zeros(window, REQUEST_DTYPE)
+            requests['op'] = self.rng.choice(ops, window, p=mix/mix.sum())
+            requests['arg'] = np.where(requests['op'] == SWAP,
+                                       self.rng.integers(0, 4, window),
+                                       self.rng.integers(0, 8, window))
+            requests['tag'] = (tag + np.arange(window))%2**16
+            requests['session'] = self.ids[self.rng.integers(0, len(self.ids), window)]
+            tag += window
+            responses, latencies = await exchange(self.reader, self.writer, requests, self.sent)
+            self.latencies.append(latencies)
+            self.statuses.append(responses['status'])
+
+
+    async def close(self):
+        requests = np.zeros(len(self.ids), REQUEST_DTYPE)
+        requests['op'] = CLOSE
+        requests['tag'] = np.arange(len(self.ids))
+        requests['session'] = self.ids
+        await exchange(self.reader, self.writer, requests, self.sent)
+        self.writer.close()
+
+
+async def runLoad(address, connections, sessions, window, duration, size, seed=DEFAULT_SEED):
+    # every connection at once, returns a dict of results
+    clients = [LoadConnection(address, seed + n*sessions) for n in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*[client.open(sessions, size) for client in clients])
+    opened = time.perf_counter()
+    await asyncio.gather(*[client.play(window, opened + duration) for client in clients])
+    elapsed = time.perf_counter() - opened
+    await asyncio.gather(*[client.close() for client in clients])
+    latencies = np.concatenate([np.zeros(0)] + [times for client in clients for times in client.latencies])
+    statuses = np.concatenate([np.zeros(0, 'uint8')] + [status for client in clients for status in client.statuses])
+    percentiles = np.percentile(latencies, [50, 90, 99, 99.9]) if len(latencies) else [0]*4
+    return {'connections'  : connections,
+            'sessions'     : connections*sessions,
+            'window'       : window,
+            'size'         : list(size),
+            'openSeconds'  : opened - start,
+            'requests'     : len(latencies),
+            'seconds'      : elapsed,
+            'requestsPerS' : len(latencies)/elapsed,
+            'latencyMs'    : {'p50'   : 1000*percentiles[0],
+                              'p90'   : 1000*percentiles[1],
+                              'p99'   : 1000*percentiles[2],
+                              'p99.9' : 1000*percentiles[3],
+                              'max'   : 1000*latencies.max() if len(latencies) else 0,
+                              },
+            'statuses'     : {name: int((statuses == status).sum())
+                              for status, name in STATUS_NAMES.items()},
+            }
+
+
+def spawnServer(host, port, unix):
+    command = [sys.executable, '-m', 'maze4d.server', '--host', host, '--port', str(port)]
+    if unix:
+        command += ['--unix', unix]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze server load generator')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='server host (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='server port (default: %(default)s)')
+    parser.add_argument('--unix', metavar='PATH',
+                        help='connect to a Unix socket at PATH instead of TCP')
+    parser.add_argument('--spawn', action='store_true',
+                        help='start a server for the run')
+    parser.add_argument('--connections', type=int, default=20,
+                        help='concurrent connections (default: %(default)s)')
+    parser.add_argument('--sessions', type=int, default=50,
+                        help='sessions per connection (default: %(default)s)')
+    parser.add_argument('--window', type=int, default=16,
+                        help='requests in flight per connection (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='seconds of load (default: %(default)s)')
+    parser.add_argument('--size', default='5',
+                        help='maze size, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the first maze (default: %(default)s)')
+    parser.add_argument('--out', metavar='PATH',
+                        help='write JSON results to PATH')
+    args = parser.parse_args(argv)
+
+    size = parseSize(args.size)
+    address = (args.host, args.port, args.unix)
+    server = spawnServer(*address) if args.spawn else None
+    try:
+        if server is not None:
+            asyncio.run(waitForServer(address, CONNECT_TIMEOUT))
+        result = asyncio.run(runLoad(address, args.connections, args.sessions, args.window,
+                                     args.duration, size, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print('{} connections, {} sessions of {} opened in {:.2f} s, {} requests in flight per connection'.format(
+          result['connections'], result['sessions'], sizeName(size), result['openSeconds'], result['window']))
+    print('{} requests in {:.2f} s: {:.0f} requests/s'.format(
+          result['requests'], result['seconds'], result['requestsPerS']))
+    print('latency ms  ' + '  '.join('{} {:.2f}'.format(name, ms) for name, ms in result['latencyMs'].items()))
+    print('statuses    ' + '  '.join('{} {}'.format(name, count) for name, count in result['statuses'].items()))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
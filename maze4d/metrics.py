@@ -0,0 +1,229 @@
+"""
+Maze quality metrics, computed for whole batches of mazes at once
+
+Every metric works on a bool array of open cells with a leading batch axis,
+(B, a, b, c, d), using shifted copies of it (a 4D cross-shaped convolution)
+instead of per-cell loops:
+    openRatio  : fraction of cells that are open
+    deadEnds   : open cells with one open neighbor
+    junctions  : open cells with three or more open neighbors
+    components : connected open regions
+    pathLength : moves on the shortest route from start to goal, -1 if none
+    branching  : side openings per cell along the shortest routes, the
+                 choices a player has to turn down on the way
+
+USAGE:
+    python -m maze4d.metrics --size 5 --count 10000
+    python -m maze4d.metrics --count 10000 --min pathLength=16 --max deadEnds=30
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .constants import BLOCK_BIT, DEFAULT_SEED
+from .scene import parseSize, sizeName
+
+################################################################################
+# METRICS
+
+WALL_PROBABILITY = 0.7 # as in MazeScene.buildMaze
+METRICS = ('openRatio', 'deadEnds', 'junctions', 'components', 'pathLength', 'branching')
+
+
+def shifted(a, axis, step, fill=False):
+    # out[..., i, ...] = a[..., i+step, ...] along axis, fill past the edge
+    out = np.full_like(a, fill)
+    source = [slice(None)]*a.ndim
+    target = [slice(None)]*a.ndim
+    if step > 0:
+        source[axis] = slice(step, None)
+        target[axis] = slice(None, -step)
+    else:
+        source[axis] = slice(None, step)
+        target[axis] = slice(-step, None)
+    out[tuple(target)] = a[tuple(source)]
+    return out
+
+
+def neighborShifts(a, fill=False):
+    # the 8 neighbors of every cell of a batch (B, a, b, c, d)
+    for axis in range(1, a.ndim):
+        for step in (-1, +1):
+            yield shifted(a, axis, step, fill)
+
+
+def neighborCounts(free):
+    # open neighbors of every cell
+    counts = np.zeros(free.shape, 'uint8')
+    for neighbors in neighborShifts(free):
+        counts += neighbors
+    return counts
+
+
+def distances(free, start):
+    # moves from start to every open cell, -1 where it cannot be reached
+    dist = np.full(free.shape, -1, 'int32')
+    frontier = np.zeros(free.shape, bool)
+    frontier[(slice(None),) + tuple(start)] = free[(slice(None),) + tuple(start)]
+    d = 0
+    while frontier.any():
+        dist[frontier] = d
+        grown = np.zeros(free.shape, bool)
+        for neighbors in neighborShifts(frontier):
+            grown |= neighbors
+        frontier = grown & free & (dist < 0)
+        d += 1
+    return dist
+
+
+def countComponents(free):
+    # label propagation: every open cell takes the smallest label around it,
+    # and jumps to its label's label, until nothing changes
+    size = free[0].size
+    none = np.iinfo('int64').max
+    labels = np.arange(free.size).reshape(free.shape)
+    labels = np.where(free, labels, none)
+    while True:
+        smallest = labels
+        for neighbors in neighborShifts(labels, none):
+            smallest = np.minimum(smallest, neighbors)
+        smallest = np.where(free, smallest, none)
+        jumped = smallest.copy()
+        jumped[free] = smallest.ravel()[smallest[free]]
+        if np.array_equal(jumped, labels):
+            break
+        labels = jumped
+    roots = free & (labels == np.arange(free.size).reshape(free.shape))
+    return roots.reshape(len(free), size).sum(axis=1)
+
+
+def mazeMetrics(free, start, goal):
+    # metrics of a batch of mazes sharing start and goal, as arrays of length B
+    batch = len(free)
+    cells = free.reshape(batch, -1)
+    counts = neighborCounts(free)
+    degree = np.where(free, counts, 0).reshape(batch, -1)
+    fromStart = distances(free, start)
+    fromGoal  = distances(free, goal)
+    pathLength = fromStart[(slice(None),) + tuple(goal)]
+    # cells on any shortest route
+    route = (fromStart >= 0) & (fromGoal >= 0) &\
+            (fromStart + fromGoal == pathLength.reshape((-1,) + (1,)*(free.ndim-1)))
+    side = neighborCounts(free & ~route)
+    routeCells = route.reshape(batch, -1).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        branching = np.where(route, side, 0).reshape(batch, -1).sum(axis=1)/routeCells
+    return {'openRatio'  : cells.mean(axis=1),
+            'deadEnds'   : ((degree == 1) & cells).sum(axis=1),
+            'junctions'  : ((degree >= 3) & cells).sum(axis=1),
+            'components' : countComponents(free),
+            'pathLength' : pathLength,
+            'branching'  : np.where(pathLength >= 0, branching, np.nan),
+            }
+
+
+def sceneMetrics(scene):
+    # metrics of a MazeScene's current maze, as plain numbers
+    free = ((scene.maze & BLOCK_BIT) == 0)[None]
+    metrics = mazeMetrics(free, scene.position, scene.goal)
+    return {name: values[0].item() for name, values in metrics.items()}
+
+
+def generateMazes(count, size, rng, p=WALL_PROBABILITY):
+    # open cells of count random mazes, walls as likely as in buildMaze, with
+    # the start and goal corners open
+    free = rng.random((count,) + tuple(size)) >= p
+    free[:,0,0,0,0] = True
+    free[(slice(None),) + tuple(n-1 for n in size)] = True
+    return free
+
+
+def withinLimits(metrics, limits):
+    # which mazes have every limited metric inside its (low, high) range,
+    # None for an open end
+    keep = np.ones(len(metrics['pathLength']), bool)
+    for name, (low, high) in limits.items():
+        values = metrics[name]
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+    return keep
+
+
+def difficultyFilter(limits):
+    # MazeScene.mazeFilter keeping mazes whose metrics are within limits
+    def accept(scene):
+        free = ((scene.maze & BLOCK_BIT) == 0)[None]
+        return bool(withinLimits(mazeMetrics(free, scene.position, scene.goal), limits)[0])
+    return accept
+
+
+################################################################################
+# MAIN
+
+def parseLimit(text):
+    # 'pathLength=16' -> ('pathLength', 16.0)
+    name, value = text.split('=')
+    if name not in METRICS:
+        raise argparse.ArgumentTypeError('unknown metric: {}'.format(name))
+    return name, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze quality metrics')
+    parser.add_argument('--size', default='5',
+                        help='maze size, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='mazes to generate (default: %(default)s)')
+    parser.add_argument('--batch', type=int, default=1000,
+                        help='mazes measured at once (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed (default: %(default)s)')
+    parser.add_argument('--min', nargs='+', type=parseLimit, default=[], metavar='METRIC=VALUE',
+                        help='keep mazes with metrics at least this')
+    parser.add_argument('--max', nargs='+', type=parseLimit, default=[], metavar='METRIC=VALUE',
+                        help='keep mazes with metrics at most this')
+    args = parser.parse_args(argv)
+
+    size = parseSize(args.size)
+    limits = {'pathLength': (0, None)}
+    for name, value in args.min:
+        limits[name] = (value, limits.get(name, (None, None))[1])
+    for name, value in args.max:
+        limits[name] = (limits.get(name, (None, None))[0], value)
+    rng = np.random.default_rng(args.seed)
+    results = {name: [] for name in METRICS}
+    kept = 0
+    start = time.perf_counter()
+    for first in range(0, args.count, args.batch):
+        free = generateMazes(min(args.batch, args.count - first), size, rng)
+        metrics = mazeMetrics(free, (0,0,0,0), [n-1 for n in size])
+        for name in METRICS:
+            results[name].append(metrics[name])
+        kept += np.count_nonzero(withinLimits(metrics, limits))
+    elapsed = time.perf_counter() - start
+    results = {name: np.concatenate(values) for name, values in results.items()}
+    solved = results['pathLength'] >= 0
+
+    print('{} mazes of {} in {:.2f} s ({:.0f} mazes/s), {:.0%} solvable'.format(
+          args.count, sizeName(size), elapsed, args.count/elapsed, solved.mean()))
+    print('{:<12}{:>10}{:>10}{:>10}{:>10}   (solvable mazes)'.format('metric', 'mean', 'p10', 'p50', 'p90'))
+    for name in METRICS:
+        values = results[name][solved]
+        if len(values):
+            print('{:<12}{:10.2f}{:10.2f}{:10.2f}{:10.2f}'.format(
+                  name, values.mean(), *np.percentile(values, [10, 50, 90])))
+    print('kept {} of {} ({:.1%}) within {}'.format(kept, args.count, kept/args.count, limits))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Offscreen rendering of maze scenes to NumPy images
+
+Draws with the pyglet renderer into a framebuffer object of a hidden
+window, so the image has the requested size whatever the screen, and reads
+it back as a (height, width, 4) uint8 RGBA array, top row first. Without a
+display (Linux, no DISPLAY) pyglet runs headless on EGL, where Mesa's
+software rasterizer works without a GPU.
+
+USAGE:
+    python -m maze4d.offscreen maze.png
+    python -m maze4d.offscreen maze.png --seed 7 --hide x --cross-section 2 --size 10
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import os
+import sys
+import time
+# installed
+import numpy as np
+import pyglet
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    pyglet.options['headless'] = True
+from pyglet.extlibs import png
+from pyglet.gl import *
+# local
+from .render import Engine
+from .scene import parseSize
+
+################################################################################
+# OFFSCREEN
+
+DEFAULT_WIDTH  = 320
+DEFAULT_HEIGHT = 240
+
+# scene modes set for every render, startScene resets only some of them
+MODE_DEFAULTS = {'hint'          : True,
+                 'showTrail'     : True,
+                 'smoothSlice'   : False,
+                 'reachableOnly' : False,
+                 'levelOfDetail' : False,
+                 'multiView'     : False,
+                 'overview'      : False,
+                 }
+
+DIMENSIONS = 'xyzw'
+
+
+class OffscreenRenderer:
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+        self.width  = width
+        self.height = height
+        self.engine = Engine(visible=False)
+        self.engine.window.switch_to()
+        # color and depth renderbuffers, no multisampling so that images
+        # only depend on the rasterizer
+        self.framebuffer = GLuint()
+        glGenFramebuffers(1, self.framebuffer)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        self.renderbuffers = (GLuint*2)()
+        glGenRenderbuffers(2, self.renderbuffers)
+        for attachment, storage, renderbuffer in ((GL_COLOR_ATTACHMENT0, GL_RGBA8, self.renderbuffers[0]),
+                                                  (GL_DEPTH_ATTACHMENT, GL_DEPTH_COMPONENT24, self.renderbuffers[1])):
+            glBindRenderbuffer(GL_RENDERBUFFER, renderbuffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, storage, width, height)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, attachment, GL_RENDERBUFFER, renderbuffer)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError('offscreen framebuffer is not supported')
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        self.scene = self.engine.scene
+        self.scene.resize(width, height)
+
+
+    def render(self, seed, size=(5,5,5,5), d=(0,1,2,3), crossSection=3,
+               forward=None, up=None, **modes):
+        # image of a new maze from seed, viewed in dimensions d (the last
+        # hidden) from the camera basis forward, up (default: the starting
+        # view), with any MODE_DEFAULTS changed by modes
+        # returns the image and seconds spent on the scene and on drawing
+        scene = self.scene
+        start = time.perf_counter()
+        for name, value in MODE_DEFAULTS.items():
+            setattr(scene, name, value)
+        scene.seed = seed
+        scene.random.seed(seed)
+        scene.mazeSize = list(size)
+        scene.regenerate()
+        for name, value in modes.items():
+            if name not in MODE_DEFAULTS:
+                raise ValueError('unknown scene mode: {}'.format(name))
+            setattr(scene, name, value)
+        scene.d = np.array(d)
+        scene.crossSection = crossSection
+        if forward is not None:
+            scene.forward = np.array(forward, 'float')/np.linalg.norm(forward)
+            scene.up = np.array(up, 'float')/np.linalg.norm(up)
+            scene.left = np.cross(scene.up, scene.forward)
+        scene.sliceTable = None
+        scene.sliceW = scene.position[scene.d[3]] + 0.5
+        scene.generateLayers()
+        drawing = time.perf_counter()
+        image = self.draw()
+        end = time.perf_counter()
+        return image, drawing - start, end - drawing
+
+
+    def draw(self):
+        # the current scene as an image
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        self.scene.on_draw()
+        glFinish()
+        pixels = (GLubyte*(4*self.width*self.height))()
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        return np.frombuffer(pixels, 'uint8').reshape(self.height, self.width, 4)[::-1].copy()
+
+
+    def close(self):
+        glDeleteRenderbuffers(2, self.renderbuffers)
+        glDeleteFramebuffers(1, self.framebuffer)
+        self.scene.endScene()
+        self.engine.window.close()
+
+
+def hiddenDims(dim):
+    # viewed dimensions with dim hidden, as dimensionSwap makes them from
+    # the starting view
+    d = [0, 1, 2, 3]
+    d[d.index(dim)], d[3] = d[3], dim
+    return d
+
+
+def writePng(path, image):
+    height, width = image.shape[:2]
+    with open(path, 'wb') as f:
+        png.Writer(width, height, greyscale=False, alpha=True).write(f, image.reshape(height, -1))
+
+
+def readPng(path):
+    width, height, rows, info = png.Reader(filename=path).asRGBA8()
+    return np.array([np.frombuffer(bytes(row), 'uint8') for row in rows]).reshape(height, width, 4)
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze offscreen render')
+    parser.add_argument('path',
+                        help='PNG to write')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='maze seed (default: %(default)s)')
+    parser.add_argument('--size', default='5',
+                        help='maze size, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--hide', choices=list(DIMENSIONS), default='w',
+                        help='hidden dimension (default: %(default)s)')
+    parser.add_argument('--cross-section', type=int, choices=[1, 2, 3], default=3,
+                        help='cross-section (default: %(default)s)')
+    parser.add_argument('--forward', type=float, nargs=3,
+                        help='camera forward vector (default: the starting view)')
+    parser.add_argument('--up', type=float, nargs=3, default=[0, 0, 1],
+                        help='camera up vector (default: %(default)s)')
+    parser.add_argument('--width', type=int, default=DEFAULT_WIDTH,
+                        help='image width (default: %(default)s)')
+    parser.add_argument('--height', type=int, default=DEFAULT_HEIGHT,
+                        help='image height (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    renderer = OffscreenRenderer(args.width, args.height)
+    image, sceneTime, drawTime = renderer.render(args.seed, parseSize(args.size),
+                                                 hiddenDims(DIMENSIONS.index(args.hide)),
+                                                 args.cross_section, args.forward, args.up)
+    renderer.close()
+    writePng(args.path, image)
+    print('{} written, scene {:.1f} ms, draw {:.1f} ms'.format(args.path, 1000*sceneTime, 1000*drawTime))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Per-cell neighbor openness of a maze
+
+An open mask has one byte per cell. Bit 2*axis is set when the neighbor one
+step down that axis is inside the maze and not a wall, bit 2*axis+1 likewise
+one step up, so the maze boundary is already closed:
+    bit  0 1 2 3 4 5 6 7
+         x- x+ y- y+ z- z+ w- w+
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from array import array
+# installed
+import numpy as np
+# local
+from .constants import BLOCK_BIT
+
+################################################################################
+# OPEN MASK
+
+# (axis, step) of each bit
+DIRECTIONS = tuple((bit//2, +1 if bit%2 else -1) for bit in range(8))
+
+# mask value -> bits set, so solvers only visit open directions
+OPEN_DIRECTIONS = tuple(tuple(bit for bit in range(8) if value & (1 << bit))
+                        for value in range(256))
+
+
+def openBit(axis, step):
+    return 1 << (2*axis + (step > 0))
+
+
+def buildOpenMask(maze):
+    # open mask of a whole maze array
+    free = (maze & BLOCK_BIT) == 0
+    mask = np.zeros(maze.shape, 'uint8')
+    for axis in range(maze.ndim):
+        lower = [slice(None)]*maze.ndim
+        upper = [slice(None)]*maze.ndim
+        lower[axis] = slice(None, -1)
+        upper[axis] = slice(1, None)
+        lower = tuple(lower)
+        upper = tuple(upper)
+        # cells above a free cell are open downwards, and the other way round
+        mask[upper] |= free[lower].astype('uint8') << (2*axis)
+        mask[lower] |= free[upper].astype('uint8') << (2*axis + 1)
+    return mask
+
+
+def updateOpenMask(mask, maze, cell):
+    # after maze[cell] changed, fix the bits of its neighbors that face it
+    free = not (maze[tuple(cell)] & BLOCK_BIT)
+    for axis, step in DIRECTIONS:
+        neighbor = list(cell)
+        neighbor[axis] += step
+        if not 0 <= neighbor[axis] < maze.shape[axis]:
+            continue
+        neighbor = tuple(neighbor)
+        bit = openBit(axis, -step)
+        if free:
+            mask[neighbor] |= bit
+        else:
+            mask[neighbor] &= ~bit & 0xff
+
+
+def neighborOffsets(shape):
+    # flat index offset of each bit's neighbor in a C-ordered array
+    strides = np.cumprod((list(shape[1:]) + [1])[::-1])[::-1]
+    return [step*int(strides[axis]) for axis, step in DIRECTIONS]
+
+
+def floodFill(mask, start, goal=None):
+    # cells reachable from start through open neighbors, as a bool array,
+    # depth-first, stopping as soon as goal is reached if one is given
+    flat = mask.ravel().tolist()
+    offsets = neighborOffsets(mask.shape)
+    start = int(np.ravel_multi_index(start, mask.shape))
+    goal = -1 if goal is None else int(np.ravel_multi_index(goal, mask.shape))
+    reached = bytearray(len(flat))
+    reached[start] = True
+    queue = [start]
+    while queue:
+        cell = queue.pop()
+        for bit in OPEN_DIRECTIONS[flat[cell]]:
+            neighbor = cell + offsets[bit]
+            if not reached[neighbor]:
+                reached[neighbor] = True
+                if neighbor == goal:
+                    queue = []
+                    break
+                queue.append(neighbor)
+    return np.frombuffer(reached, bool).reshape(mask.shape)
+
+
+def bidirectionalSearch(mask, start, goal):
+    # shortest route from start to goal through open neighbors, as flat cell
+    # indices with both ends included, None when the goal is not reachable
+    # breadth-first from both ends, always growing the smaller frontier
+    flat = mask.ravel().tolist()
+    offsets = neighborOffsets(mask.shape)
+    start = int(np.ravel_multi_index(start, mask.shape))
+    goal  = int(np.ravel_multi_index(goal, mask.shape))
+    if start == goal:
+        return [start]
+    # parent of each reached cell on either side, -1 if not reached
+    parents = (array('i', [-1])*len(flat),
+               array('i', [-1])*len(flat))
+    parents[0][start] = start
+    parents[1][goal]  = goal
+    frontiers = [[start], [goal]]
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        parent = parents[side]
+        other  = parents[1-side]
+        frontier = []
+        meetings = []
+        for cell in frontiers[side]:
+            for bit in OPEN_DIRECTIONS[flat[cell]]:
+                neighbor = cell + offsets[bit]
+                if parent[neighbor] < 0:
+                    parent[neighbor] = cell
+                    if other[neighbor] >= 0:
+                        meetings.append(neighbor)
+                    frontier.append(neighbor)
+        if meetings:
+            # finish the level, the other side may reach some meetings sooner
+            routes = [traceBack(parents[0], cell)[::-1] + traceBack(parents[1], cell)[1:]
+                      for cell in meetings]
+            return min(routes, key=len)
+        frontiers[side] = frontier
+    return None
+
+
+def traceBack(parent, cell):
+    # cells from cell back to the root of a parent array
+    route = [cell]
+    while parent[cell] != cell:
+        cell = parent[cell]
+        route.append(cell)
+    return route
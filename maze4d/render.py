@@ -0,0 +1,687 @@
+"""
+pyglet renderer for the 4D maze
+
+Only this module imports pyglet. It opens the window, turns input into scene
+actions and draws the NumPy geometry buffers of maze4d.scene.MazeScene.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from ctypes import POINTER, c_void_p
+import argparse
+import os
+import threading
+import time
+# installed
+import pyglet
+from pyglet.window import key,mouse
+from pyglet.gl import *
+import numpy as np
+# local
+from .constants import STEP, FOV, NEAR, FAR, MAX_FILTER_TRIES
+from .controls import readKeymap
+from .replay import Recorder
+from .scene import MazeScene, QUADS, TRIANGLES, parseSize
+from .timing import PhaseTimer, PHASE_WIDTH, TIMING_REFRESH, timed
+from .tracing import TRACER
+
+################################################################################
+# GL CONSTANTS
+
+GL_MODES = {QUADS     : GL_QUADS,
+            TRIANGLES : GL_TRIANGLES,
+            }
+
+# multi-view: layers of each section in drawing order, and the background
+# of the section hiding the current hidden dimension
+VIEW_LAYERS    = ('maze', 'goal', 'cube', 'hint')
+VIEW_HIGHLIGHT = (0.9, 0.9, 1.0, 0.5)
+
+################################################################################
+# CONTROLS
+
+def keySymbol(name):
+    # key names as in pyglet.window.key, digits may omit the underscore
+    name = name.strip().upper()
+    if name.isdigit():
+        name = '_' + name
+    return getattr(key, name, None)
+
+
+def loadKeymap(path=None):
+    # key symbol -> action
+    symbols = {}
+    for action, names in readKeymap(path).items():
+        for name in names:
+            symbol = keySymbol(name)
+            if symbol is None:
+                print('unknown key in {}: {}'.format(path, name))
+                continue
+            symbols[symbol] = action
+    return symbols
+
+
+################################################################################
+# EVENT LOOP
+
+class IdleEventLoop(pyglet.app.EventLoop):
+    # redraws only when the engine was invalidated, so a static scene sleeps
+    # until the next input event instead of drawing every clock tick
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+
+
+    def idle(self):
+        dt = self.clock.update_time()
+        self.clock.call_scheduled_functions(dt)
+        if self.engine.invalid and not self.engine.window.has_exit:
+            self.engine.invalid = False
+            self.engine.window.switch_to()
+            self.engine.window.dispatch_event('on_draw')
+            self.engine.window.flip()
+            self.engine.frameShown()
+        return self.clock.get_sleep_time(True)
+
+
+################################################################################
+# GENERIC GAME SCENE ENGINE
+
+class Engine():
+    def __init__(self, keymapPath=None, seed=None, visible=True, size=(5,5,5,5), background=False):
+        # startup metrics, seconds from here to the first frame shown and to
+        # the first frame of a playable maze, see frameShown
+        self.startTime = time.perf_counter()
+        self.startup = {'firstFrame' : None,
+                        'playable'   : None,
+                        }
+        # initialize window
+        config = Config(sample_buffers=1,
+                        samples=4,
+                        depth_size=16,
+                        double_buffer=True,)
+        self.width  = 640
+        self.height = 480
+        self.ratio  = self.width / float(self.height)
+        try:
+            self.window = pyglet.window.Window(resizable=True, 
+                                               #width=self.width,
+                                               #height=self.height,
+                                               visible=visible,
+                                               config=config)
+        except:
+            self.window = pyglet.window.Window(resizable=True, 
+                                               #width=self.width,
+                                               height=self.height,
+                                               visible=visible)
+        # initialize graphics
+        self.initGL()
+        # initialize controls/resizing
+        self.fullscreen = False
+        self.keymap = loadKeymap(keymapPath)
+        self.window.push_handlers(self.on_resize,
+                                  self.on_expose)
+        # redraw flag, see IdleEventLoop
+        self.invalid = True
+        # frame timing, shared by all scenes
+        self.timer = PhaseTimer()
+        # CPU usage over the last second, shown in the caption
+        self.caption = self.window.caption
+        self.cpuUsage = 0.0
+        self.cpuTime = time.process_time()
+        self.wallTime = time.perf_counter()
+        pyglet.clock.schedule_interval(self.measureLoad, 1.0)
+        # initialize first scene, with background the maze is built while
+        # the window already shows its progress
+        self.scene = ClassicMazeScene(self, seed, size, background)
+
+
+    def initGL(self):
+        glClearColor(1.0, 1.0, 1.0, 0.5)                  # white background
+        glEnable(GL_DEPTH_TEST)                           # enable depth testing
+        glClearDepth(1.0)                                 # setup depth buffer
+        glDepthFunc(GL_LEQUAL)                            # type of depth testing
+        glHint(GL_PERSPECTIVE_CORRECTION_HINT, GL_NICEST) # really nice perspective calculations
+        glEnable(GL_CULL_FACE)                            # do not draw backfaces
+        glEnable(GL_BLEND)                                # add transparency
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA) # type of transparency, alpha = 1.0 -> opaque, alpha = 0.0 -> transparent
+        glDepthMask(GL_TRUE)
+
+
+    def on_resize(self, width, height):
+        self.width  = width
+        self.height = height
+        self.ratio  = self.width / float(self.height)
+        self.invalid = True
+        return pyglet.event.EVENT_HANDLED
+
+
+    def on_expose(self):
+        self.invalid = True
+
+
+    def measureLoad(self, dt):
+        cpuTime = time.process_time()
+        wallTime = time.perf_counter()
+        self.cpuUsage = (cpuTime - self.cpuTime)/(wallTime - self.wallTime)
+        self.cpuTime = cpuTime
+        self.wallTime = wallTime
+        self.window.set_caption('{} - CPU {:.1f}%'.format(self.caption, 100*self.cpuUsage))
+
+
+    def frameShown(self):
+        # after every flip, until the maze is playable
+        if self.startup['playable'] is not None:
+            return
+        seconds = time.perf_counter() - self.startTime
+        if self.startup['firstFrame'] is None:
+            self.startup['firstFrame'] = seconds
+        if self.scene.ready:
+            self.startup['playable'] = seconds
+            print('startup: first frame {:.0f} ms, playable {:.0f} ms'.format(
+                  1000*self.startup['firstFrame'], 1000*self.startup['playable']))
+
+
+    def changeScene(self, prevScene, nextScene=None):
+        # before calling this command:
+        #     end prevScene
+        #     initialize nextScene
+        # this function only changes the pointer in the engine
+        if nextScene:
+            self.scene = nextScene
+
+
+################################################################################
+# Game Maze Scene
+
+class ClassicMazeScene(MazeScene):
+    def __init__(self, engine, seed=None, size=(5,5,5,5), background=False):
+        self.engine = engine
+        self.window = engine.window
+        self.keymap = self.engine.keymap
+        self.overlay = None
+        # mouse controls
+        self.dragging = False
+        # build every maze in a background thread, see startScene
+        self.background = background
+        self.ready = False
+        super().__init__(engine.width, engine.height, engine.timer, size, seed)
+        self.actions.update({'fullscreen'     : (self.toggleFullscreen, ()),
+                             'timing overlay' : (self.toggleTimingOverlay, ()),
+                             'export timings' : (self.exportTimings, ()),
+                             })
+
+
+    def startScene(self):
+        if not self.background:
+            super().startScene()
+            self.sceneReady()
+            return
+        # the headless startScene runs in a thread, the window only draws its
+        # progress until it is done
+        self.ready = False
+        self.progress = (0.0, 'starting')
+        self.loadError = None
+        self.progressLabel = pyglet.text.Label('',
+                                               font_size=12,
+                                               color=(0, 0, 0, 255),
+                                               anchor_x='center',
+                                               anchor_y='bottom')
+        self.window.push_handlers(on_draw=self.drawProgress)
+        self.loader = threading.Thread(target=self.buildScene, daemon=True)
+        self.loader.start()
+        pyglet.clock.schedule_interval(self.pollLoader, STEP)
+        self.engine.invalid = True
+
+
+    def buildScene(self):
+        # in the loader thread, touches no GL or window state
+        try:
+            with TRACER.span('startScene'):
+                for self.progress in self.startSteps():
+                    pass
+        except Exception as error:
+            self.loadError = error
+
+
+    def pollLoader(self, dt):
+        self.engine.invalid = True
+        if self.loader.is_alive():
+            return
+        pyglet.clock.unschedule(self.pollLoader)
+        self.window.pop_handlers()
+        if self.loadError is not None:
+            raise self.loadError
+        # the map was laid out for the window size the build started with
+        if (self.width, self.height) != (self.engine.width, self.engine.height):
+            self.resize(self.engine.width, self.engine.height)
+        self.sceneReady()
+
+
+    def sceneReady(self):
+        if not self.filterPassed:
+            print('no maze passed the filter in {} tries, keeping this one'.format(MAX_FILTER_TRIES))
+        self.releaseInput()
+        # do last so that everything is already setup
+        self.window.push_handlers(self.on_draw,
+                                  self.on_key_press,
+                                  self.on_key_release,
+                                  self.on_deactivate,
+                                  self.on_mouse_press,
+                                  self.on_mouse_release,
+                                  self.on_mouse_drag,
+                                  self.on_mouse_scroll,
+                                  self.on_resize)
+        self.simulating = False
+        self.ready = True
+        self.invalidate()
+
+
+    def endScene(self):
+        # while loading only the progress handler is pushed, the loader
+        # thread is left to finish on its own
+        self.releaseInput()
+        self.window.pop_handlers()
+        pyglet.clock.unschedule(self.pollLoader)
+        pyglet.clock.unschedule(self.tick)
+
+
+    def releaseInput(self):
+        # releases are not seen while the input handlers are popped
+        if self.heldActions:
+            self.releaseAll()
+        self.dragging = False
+
+
+    def invalidate(self):
+        # redraw once, and keep simulating while something is animating,
+        # never while the loader thread is building the next maze
+        self.engine.invalid = True
+        if self.ready and not self.simulating and self.animating():
+            self.simulating = True
+            pyglet.clock.schedule_interval(self.tick, STEP)
+
+
+    def tick(self, dt):
+        self.advance(dt)
+        self.engine.invalid = True
+        if not self.animating():
+            self.simulating = False
+            pyglet.clock.unschedule(self.tick)
+
+
+    def on_key_press(self, symbol, modifiers):
+        action = self.keymap.get(symbol)
+        if action is not None:
+            self.doAction(action)
+            self.invalidate()
+            return pyglet.event.EVENT_HANDLED
+
+
+    def on_key_release(self, symbol, modifiers):
+        action = self.keymap.get(symbol)
+        if action in self.heldActions:
+            self.releaseAction(action)
+
+
+    def on_deactivate(self):
+        # releases are not reported while the window is in the background
+        if self.heldActions:
+            self.releaseAll()
+
+
+    def toggleFullscreen(self):
+        self.engine.fullscreen = not self.engine.fullscreen
+        self.window.set_fullscreen(self.engine.fullscreen)
+
+
+    def toggleTimingOverlay(self):
+        self.timer.enabled = not self.timer.enabled
+        if self.timer.enabled:
+            self.timer.clear()
+            self.overlay = pyglet.text.Label('',
+                                             font_name=('Consolas', 'Courier New', 'DejaVu Sans Mono'),
+                                             font_size=9,
+                                             color=(0, 0, 0, 255),
+                                             multiline=True,
+                                             width=400,
+                                             anchor_y='top')
+            self.overlayTime = time.perf_counter()
+            self.overlayFrames = 0
+            pyglet.clock.schedule_interval(self.refreshTimingOverlay, TIMING_REFRESH)
+        else:
+            self.overlay = None
+            pyglet.clock.unschedule(self.refreshTimingOverlay)
+
+
+    def refreshTimingOverlay(self, dt):
+        now = time.perf_counter()
+        frames = self.timer.count[self.timer.index['on_draw']]
+        fps = (frames - self.overlayFrames)/(now - self.overlayTime)
+        self.overlayTime = now
+        self.overlayFrames = frames
+        lines = ['FPS {:6.1f}   CPU {:5.1f}%'.format(fps, 100*self.engine.cpuUsage)]
+        startup = self.engine.startup
+        if startup['playable'] is not None:
+            lines.append('startup {:.0f} ms first frame, {:.0f} ms playable'.format(
+                         1000*startup['firstFrame'], 1000*startup['playable']))
+        if self.reachableOnly and tuple(self.d) in self.reachableWalls:
+            kept, total = self.reachableWalls[tuple(self.d)]
+            lines.append('reachable walls {} of {} faces ({:.0%} fewer)'.format(
+                         kept, total, 1 - kept/total if total else 0))
+        lines += ['chunks {} drawn, {} culled'.format(self.chunksDrawn, self.chunksCulled),
+                  '{:<{}}{:>8}{:>8}{:>8} ms'.format('phase', PHASE_WIDTH, 'p50', 'p95', 'p99'),
+                  ]
+        for phase in self.timer.phases:
+            p50, p95, p99 = self.timer.percentiles(phase)
+            lines.append('{:<{}}{:8.2f}{:8.2f}{:8.2f}'.format(phase, PHASE_WIDTH, 1000*p50, 1000*p95, 1000*p99))
+        self.overlay.text = '\n'.join(lines)
+        self.engine.invalid = True
+
+
+    def exportTimings(self):
+        path = time.strftime('timings-%Y%m%d-%H%M%S.csv')
+        self.timer.exportCSV(path)
+        print('frame timings written to {}'.format(os.path.abspath(path)))
+
+
+    def drawTimingOverlay(self):
+        glViewport(0, 0, self.engine.width, self.engine.height)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glOrtho(0, self.engine.width, 0, self.engine.height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        self.overlay.x = 4
+        self.overlay.y = self.engine.height - 4
+        self.overlay.draw()
+        glEnable(GL_DEPTH_TEST)
+
+
+    def drawProgress(self):
+        # progress bar of the maze being built, with its stage
+        width, height = self.engine.width, self.engine.height
+        glViewport(0, 0, width, height)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glOrtho(0, width, 0, height, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glDisable(GL_DEPTH_TEST)
+        fraction, stage = self.progress
+        left, right = 0.25*width, 0.25*width + 0.5*width*fraction
+        bottom, top = 0.5*height - 8, 0.5*height + 8
+        vertices = np.array([[0.25*width, bottom, 0], [0.75*width, bottom, 0],
+                             [0.75*width, top,    0], [0.25*width, top,    0],
+                             [left,       bottom, 0], [right,      bottom, 0],
+                             [right,      top,    0], [left,       top,    0],
+                             ], 'float32')
+        colors = np.array([[0.8, 0.8, 0.8, 1.0]]*4 + [[0.0, 0.0, 0.0, 1.0]]*4, 'float32')
+        self.drawArrays(vertices, colors, QUADS)
+        self.progressLabel.text = '{} {}x{}x{}x{}'.format(stage, *self.mazeSize)
+        self.progressLabel.x = width//2
+        self.progressLabel.y = int(top) + 8
+        self.progressLabel.draw()
+        glEnable(GL_DEPTH_TEST)
+
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        if button & mouse.LEFT:
+            if x >= self.mazeX and y >= self.mazeY:
+                # rotate maze
+                self.dragging = True
+                self.startDrag()
+            elif x >= self.mapX and y > self.mapY:
+                # movement / dimension swap
+                halfWidth  = self.mapX + self.mapWidth//2
+                halfHeight = self.mapY + self.mapHeight//2
+                l = self.mapL*self.mapHeight//2
+                d = -1
+                if   halfHeight + 2.5*l <= y <= halfHeight + 3.5*l:
+                    d = 0
+                elif halfHeight + 0.5*l <= y <= halfHeight + 1.5*l:
+                    d = 1
+                elif halfHeight - 1.5*l <= y <= halfHeight - 0.5*l:
+                    d = 2
+                elif halfHeight - 3.5*l <= y <= halfHeight - 2.5*l:
+                    d = 3
+                if d > -1:
+                    if halfWidth - (self.size[d]/2)*l <= x <= halfWidth + (self.size[d]/2)*l:
+                        self.doAction('exclude ' + 'xyzw'[d])
+                    elif halfWidth - (self.size[d]/2 + 2)*l <= x <= halfWidth - (self.size[d]/2 + 0.5)*l:
+                        # <-
+                        self.doAction('xyzw'[d] + '-')
+                    elif halfWidth + (self.size[d]/2 + 2)*l >= x >= halfWidth + (self.size[d]/2 + 0.5)*l:
+                        # ->
+                        self.doAction('xyzw'[d] + '+')
+
+        #
+        if button & mouse.MIDDLE:
+            self.doAction('hints')
+
+        # generate new maze
+        if button & mouse.RIGHT:
+            self.doAction('regenerate')
+
+        self.invalidate()
+
+
+    def on_mouse_release(self, x, y, button, modifiers):
+        if self.dragging:
+            self.dragging = False
+
+
+    def on_mouse_drag(self, x, y, dx, dy, button, modifiers):
+        if self.dragging:
+            self.drag(dx, dy)
+            self.invalidate()
+            
+
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        if scroll_y > 0 or scroll_x > 0:
+            self.doAction('cross-sections')
+        elif scroll_y < 0 or scroll_x < 0:
+            self.doAction('previous cross-section')
+        self.invalidate()
+
+
+    def on_resize(self, width, height):
+        self.engine.width  = width
+        self.engine.height = height
+        self.engine.ratio  = self.engine.width / float(self.engine.height)
+        self.resize(width, height)
+        self.invalidate()
+        return pyglet.event.EVENT_HANDLED
+
+
+    @timed('on_draw')
+    def on_draw(self):
+        if self.overview:
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            self.drawOverview()
+        elif self.multiView:
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            self.drawViews()
+        else:
+            self.drawSingleView()
+
+        # map
+        glViewport(self.mapX, self.mapY, self.mapWidth, self.mapHeight)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        #gluPerspective(FOV, self.mapWidth / float(self.mapHeight), 0.1, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        self.drawMap()
+
+        # frame timing
+        if self.overlay is not None:
+            self.drawTimingOverlay()
+
+
+    def drawSingleView(self):
+        # game
+        glViewport(self.mazeX, self.mazeY, self.mazeWidth, self.mazeHeight)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(FOV, self.mazeWidth / float(self.mazeHeight), NEAR, FAR)
+        glMatrixMode(GL_MODELVIEW)
+
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glLoadIdentity()
+
+        eye, center, up = self.cameraLookAt()
+        #fx = r * cos(self.rotZ*DEG) * cos(self.rotY*DEG)
+        #fy = r *-sin(self.rotZ*DEG) * cos(self.rotY*DEG)
+        #fz = r *                      sin(self.rotY*DEG)
+        #ux =     cos(self.rotZ*DEG) *-sin(self.rotY*DEG)
+        #uy =    -sin(self.rotZ*DEG) *-sin(self.rotY*DEG)
+        #uz =                          cos(self.rotY*DEG)
+        #glu.gluLookAt(z-fx, y-fy, z-fz,\
+        #              z,    y,    z,\
+        #              ux, uy, uz)
+
+        glu.gluLookAt(eye[0],    eye[1],    eye[2],
+                      center[0], center[1], center[2],
+                      up[0],     up[1],     up[2])
+
+        # draw
+        self.drawMaze()
+        self.drawGoal()
+        self.drawCube()
+        self.drawTrail()
+        self.drawHint()
+
+
+    @timed('drawViews')
+    def drawViews(self):
+        # 2x2 grid of the sections hiding x, y (top) and z, w (bottom), all
+        # seen by the same camera
+        width  = self.mazeWidth//2
+        height = self.mazeHeight//2
+        glEnable(GL_SCISSOR_TEST)
+        for hidden, view in enumerate(self.views):
+            x = self.mazeX + width*(hidden%2)
+            y = self.mazeY + height*(1 - hidden//2)
+            glViewport(x, y, width, height)
+            glScissor(x, y, width, height)
+            if hidden == self.d[3]:
+                glClearColor(*VIEW_HIGHLIGHT)
+                glClear(GL_COLOR_BUFFER_BIT)
+                glClearColor(1.0, 1.0, 1.0, 0.5)
+            glMatrixMode(GL_PROJECTION)
+            glLoadIdentity()
+            gluPerspective(FOV, width / float(height), NEAR, FAR)
+            glMatrixMode(GL_MODELVIEW)
+            glLoadIdentity()
+            eye, center, up = self.cameraLookAt(view['d'])
+            glu.gluLookAt(eye[0],    eye[1],    eye[2],
+                          center[0], center[1], center[2],
+                          up[0],     up[1],     up[2])
+            for layer in VIEW_LAYERS:
+                vertices, colors = view[layer]
+                self.drawArrays(vertices, colors, QUADS)
+        glDisable(GL_SCISSOR_TEST)
+
+
+    @timed('drawOverview')
+    def drawOverview(self):
+        # every slice at once, the far plane pushed back to fit them all
+        eye, center, up = self.overviewLookAt()
+        glViewport(self.mazeX, self.mazeY, self.mazeWidth, self.mazeHeight)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluPerspective(FOV, self.mazeWidth / float(self.mazeHeight), NEAR,
+                       max(FAR, 2*np.linalg.norm(center - eye)))
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glu.gluLookAt(eye[0],    eye[1],    eye[2],
+                      center[0], center[1], center[2],
+                      up[0],     up[1],     up[2])
+        self.drawArrays(self.overviewVertices, self.overviewColors, self.overviewMode)
+        self.drawArrays(self.overviewMarkersVertices, self.overviewMarkersColors, self.overviewMarkersMode)
+
+
+    def drawArrays(self, vertices, colors, mode):
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices.ctypes.data)
+        glColorPointer(4, GL_FLOAT, 0, colors.ctypes.data)
+        glDrawArrays(GL_MODES[mode], 0, len(vertices))
+
+
+    def drawChunks(self, vertices, colors, mode, indices, first, count):
+        # the given ranges of an index buffer, in order, in a single call
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices.ctypes.data)
+        glColorPointer(4, GL_FLOAT, 0, colors.ctypes.data)
+        offsets = indices.ctypes.data + indices.itemsize*first
+        glMultiDrawElements(GL_MODES[mode],
+                            count.ctypes.data_as(POINTER(GLsizei)),
+                            GL_UNSIGNED_INT,
+                            (c_void_p*len(first))(*offsets.tolist()),
+                            len(first))
+
+
+    @timed('drawMaze')
+    def drawMaze(self):
+        # only the chunks in view, back to front
+        visible = self.visibleMazeChunks(self.mazeWidth / float(self.mazeHeight))
+        indices, chunks, firstIndex = self.mazeDrawOrder()
+        chunks = chunks[visible[chunks]]
+        self.drawChunks(self.mazeVertices, self.mazeColors, self.mazeMode,
+                        indices, firstIndex[chunks], self.mazeChunkCount[chunks])
+        self.drawGoal()
+
+
+    @timed('drawCube')
+    def drawCube(self):
+        self.drawArrays(self.cubeVertices, self.cubeColors, self.cubeMode)
+
+
+    @timed('drawGoal')
+    def drawGoal(self):
+        self.drawArrays(self.goalVertices, self.goalColors, self.goalMode)
+
+
+    @timed('drawMap')
+    def drawMap(self):
+        self.drawArrays(self.mapVertices, self.mapColors, self.mapMode)
+
+
+    @timed('drawHint')
+    def drawHint(self):
+        self.drawArrays(self.hintVertices, self.hintColors, self.hintMode)
+
+
+    @timed('drawTrail')
+    def drawTrail(self):
+        self.drawArrays(self.trailVertices, self.trailColors, self.trailMode)
+
+
+################################################################################
+# MAIN
+
+def main(keymapPath=None):
+    parser = argparse.ArgumentParser(description='4D Maze game')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write a Chrome trace of regeneration events to PATH')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the seed and all input to PATH, see maze4d.replay')
+    parser.add_argument('--seed', type=int,
+                        help='maze seed (default: random)')
+    parser.add_argument('--size', default='5',
+                        help='maze size, N or AxBxCxD (default: %(default)s)')
+    args = parser.parse_args()
+    if args.trace:
+        TRACER.start(args.trace)
+    game = Engine(keymapPath, args.seed, size=parseSize(args.size), background=True)
+    if args.record:
+        game.scene.recorder = Recorder(args.record, game.scene)
+    pyglet.app.event_loop = IdleEventLoop(game)
+    pyglet.app.run()
@@ -0,0 +1,286 @@
+"""
+Input recording and deterministic replay of play sessions
+
+A recording is the maze seed plus every input the scene received, each with
+its time since the recording started. Replaying it through maze4d.scene
+reproduces the session exactly, as fast as the scene can go, and reports how
+long each event took so stalls can be found and measured.
+
+USAGE:
+    python 4DMazeGameClassic.py --record session.m4r
+    python -m maze4d.replay session.m4r
+    python -m maze4d.replay session.m4r --render --csv events.csv
+
+--render draws every event with the pyglet renderer in a hidden window, use
+PYGLET_HEADLESS=True on machines without a display.
+
+FILE FORMAT (little-endian):
+    header  : '4DMR', version, seed, size (4 x uint16), width, height
+    actions : uint16 length, action names separated by newlines
+    events  : time (float32 seconds), event (uint8), a, b (int16)
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import atexit
+import struct
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .constants import STEP
+from .controls import DEFAULT_KEYMAP, HELD_ACTIONS
+from .scene import MazeScene
+from .timing import PHASE_WIDTH
+from .tracing import TRACER
+
+################################################################################
+# FILE FORMAT
+
+MAGIC   = b'4DMR'
+VERSION = 1
+HEADER  = struct.Struct('<4sBI6H')
+NAMES   = struct.Struct('<H')
+EVENT   = struct.Struct('<fBhh')
+EVENT_DTYPE = np.dtype([('time', '<f4'), ('event', 'u1'), ('a', '<i2'), ('b', '<i2')])
+
+# events, with the meaning of a and b
+ACTION      = 0 # a: action index
+RELEASE     = 1 # a: action index
+RELEASE_ALL = 2
+TICK        = 3 # a: simulation steps run, b: frame time in 0.1 ms
+START_DRAG  = 4
+DRAG        = 5 # a, b: mouse dx, dy
+RESIZE      = 6 # a, b: width, height
+
+EVENT_NAMES = {ACTION      : 'action',
+               RELEASE     : 'release',
+               RELEASE_ALL : 'release all',
+               TICK        : 'tick',
+               START_DRAG  : 'start drag',
+               DRAG        : 'drag',
+               RESIZE      : 'resize',
+               }
+
+# actions that only change the window or write files, not replayed
+SKIPPED_ACTIONS = ('fullscreen',
+                   'timing overlay',
+                   'export timings',
+                   )
+
+################################################################################
+# RECORDING
+
+class Recorder:
+    # streams the input of one scene to a file, set as scene.recorder
+    def __init__(self, path, scene):
+        self.path = path
+        self.names = list(DEFAULT_KEYMAP)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, scene.seed,
+                                    *scene.mazeSize, scene.width, scene.height))
+        names = '\n'.join(self.names).encode()
+        self.file.write(NAMES.pack(len(names)) + names)
+        self.origin = time.perf_counter()
+        atexit.register(self.close)
+
+
+    def write(self, event, a=0, b=0):
+        self.file.write(EVENT.pack(time.perf_counter() - self.origin, event, a, b))
+
+
+    def action(self, action):
+        self.write(ACTION, self.index[action])
+
+
+    def release(self, action):
+        self.write(RELEASE, self.index[action])
+
+
+    def releaseAll(self):
+        self.write(RELEASE_ALL)
+
+
+    def tick(self, dt, steps):
+        self.write(TICK, steps, min(round(dt*1e4), 0x7fff))
+
+
+    def startDrag(self):
+        self.write(START_DRAG)
+
+
+    def drag(self, dx, dy):
+        self.write(DRAG, dx, dy)
+
+
+    def resize(self, width, height):
+        self.write(RESIZE, width, height)
+
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def readRecording(path):
+    # returns header fields, action names and the events as a structured array
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, *rest = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a version {} maze recording: {}'.format(VERSION, path))
+    header = {'seed'   : seed,
+              'size'   : list(rest[:4]),
+              'width'  : rest[4],
+              'height' : rest[5],
+              }
+    offset = HEADER.size
+    length, = NAMES.unpack_from(data, offset)
+    offset += NAMES.size
+    names = data[offset:offset + length].decode().split('\n')
+    offset += length
+    # a session cut short may end in a partial event
+    count = (len(data) - offset)//EVENT.size
+    events = np.frombuffer(data, EVENT_DTYPE, count, offset)
+    return header, names, events
+
+
+def describeEvent(event, names):
+    kind = event['event']
+    if kind in (ACTION, RELEASE):
+        return '{} {}'.format(EVENT_NAMES[kind], names[event['a']])
+    if kind == TICK:
+        return 'tick {} steps, {:.1f} ms'.format(event['a'], event['b']/10)
+    if kind in (DRAG, RESIZE):
+        return '{} {} {}'.format(EVENT_NAMES[kind], event['a'], event['b'])
+    return EVENT_NAMES.get(kind, 'unknown {}'.format(kind))
+
+
+################################################################################
+# REPLAY
+
+def applyEvent(scene, event, names):
+    kind = event['event']
+    if kind == ACTION:
+        action = names[event['a']]
+        if action in HELD_ACTIONS or (action in scene.actions and action not in SKIPPED_ACTIONS):
+            scene.doAction(action)
+    elif kind == RELEASE:
+        scene.releaseAction(names[event['a']])
+    elif kind == RELEASE_ALL:
+        scene.releaseAll()
+    elif kind == TICK:
+        # the recorded steps, not the frame time, keep the replay exact
+        for _ in range(event['a']):
+            scene.update(STEP)
+    elif kind == START_DRAG:
+        scene.startDrag()
+    elif kind == DRAG:
+        scene.drag(int(event['a']), int(event['b']))
+    elif kind == RESIZE:
+        scene.resize(int(event['a']), int(event['b']))
+
+
+def replay(path, render=False):
+    # runs every event of a recording, returns the header, action names,
+    # events, seconds taken per event and the replayed scene
+    header, names, events = readRecording(path)
+    if render:
+        # only imported here, so headless replays do not need pyglet
+        from pyglet.gl import glFinish
+        from .render import Engine
+        engine = Engine(seed=header['seed'], visible=False, size=header['size'])
+        engine.window.switch_to()
+        scene = engine.scene
+        scene.resize(header['width'], header['height'])
+    else:
+        scene = MazeScene(header['width'], header['height'],
+                          size=header['size'], seed=header['seed'])
+    scene.timer.enabled = True
+    scene.timer.clear()
+    times = np.zeros(len(events))
+    for i, event in enumerate(events):
+        start = time.perf_counter()
+        applyEvent(scene, event, names)
+        if render:
+            scene.on_draw()
+            glFinish()
+        times[i] = time.perf_counter() - start
+    return header, names, events, times, scene
+
+
+def report(header, names, events, times, scene, slowest=10):
+    length = float(events['time'][-1]) if len(events) else 0.0
+    ticks = events[events['event'] == TICK]
+    print('session  {:.1f} s, {} events ({} ticks), seed {}, {}'.format(
+          length, len(events), len(ticks), header['seed'],
+          'x'.join(str(n) for n in header['size'])))
+    total = times.sum()
+    print('replay   {:.3f} s ({:.1f}x real time)'.format(total, length/total if total else 0))
+    if not len(events):
+        return
+    p50, p95, p99 = 1000*np.percentile(times, [50, 95, 99])
+    print('event    p50 {:.2f}  p95 {:.2f}  p99 {:.2f}  max {:.2f} ms'.format(
+          p50, p95, p99, 1000*times.max()))
+    # frame times of the recorded session, long ones are stalls the player saw
+    stalls = ticks[ticks['b'] > 20000*STEP]
+    if len(stalls):
+        worst = stalls[np.argmax(stalls['b'])]
+        print('recorded {} ticks over 2 frames long, worst {:.1f} ms at {:.2f} s'.format(
+              len(stalls), worst['b']/10, worst['time']))
+    print('slowest events:')
+    for i in np.argsort(times)[::-1][:slowest]:
+        print('    {:9.3f} s  {:<36}{:8.2f} ms'.format(
+              events['time'][i], describeEvent(events[i], names), 1000*times[i]))
+    print('{:<{}}{:>8}{:>8}{:>8} ms'.format('phase', PHASE_WIDTH, 'p50', 'p95', 'p99'))
+    for phase in scene.timer.phases:
+        if len(scene.timer.history(phase)):
+            p50, p95, p99 = scene.timer.percentiles(phase)
+            print('{:<{}}{:8.2f}{:8.2f}{:8.2f}'.format(phase, PHASE_WIDTH, 1000*p50, 1000*p95, 1000*p99))
+
+
+def writeEventTimes(path, names, events, times):
+    with open(path, 'w') as f:
+        f.write('time,event,ms\n')
+        for event, seconds in zip(events, times):
+            f.write('{:.4f},{},{:.4f}\n'.format(event['time'],
+                                                describeEvent(event, names),
+                                                1000*seconds))
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='replay a 4D Maze recording')
+    parser.add_argument('path',
+                        help='recording from 4DMazeGameClassic.py --record')
+    parser.add_argument('--render', action='store_true',
+                        help='also draw every event in a hidden window')
+    parser.add_argument('--slowest', type=int, default=10,
+                        help='slowest events to list (default: %(default)s)')
+    parser.add_argument('--csv', metavar='PATH',
+                        help='write the time taken by every event to PATH')
+    parser.add_argument('--timings', metavar='PATH',
+                        help='write the per-phase timings to PATH')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write a Chrome trace of the replay to PATH')
+    args = parser.parse_args(argv)
+    if args.trace:
+        TRACER.start(args.trace)
+    header, names, events, times, scene = replay(args.path, args.render)
+    report(header, names, events, times, scene, args.slowest)
+    if args.csv:
+        writeEventTimes(args.csv, names, events, times)
+    if args.timings:
+        scene.timer.exportCSV(args.timings)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Euler and quaternion rotation of the camera basis
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from math import sin, cos, sqrt
+# installed
+import numpy as np
+# local
+from .constants import DEG
+
+################################################################################
+# EULER ROTATION
+
+def calculateEulerVectors(rotZ, rotY):
+    sz = sin(rotZ*DEG)
+    cz = cos(rotZ*DEG)
+    sy = sin(rotY*DEG)
+    cy = cos(rotY*DEG)
+    f = np.array([ cz * cy,\
+                  -sz * cy,\
+                        sy,\
+                  ])
+    l = np.array([-sz * cy,\
+                   cz * cy,\
+                        sy,\
+                  ])
+    u = np.array([ cz *-sy,\
+                  -sz *-sy,\
+                        cy,\
+                  ])
+    return f, l, u
+
+
+################################################################################
+# QUATERNION ROTATION
+
+
+def quaternionRotate(p, theta, v):
+    ct = cos(theta/2)
+    st = sin(theta/2)
+    pn = [0,\
+          p[0],\
+          p[1],\
+          p[2],\
+          ]
+    q = [ct,\
+         st*v[0],\
+         st*v[1],\
+         st*v[2],\
+         ]
+    qi = [+q[0],\
+          -q[1],\
+          -q[2],\
+          -q[3],\
+          ]
+    qpqi = quaternionMultiply(quaternionMultiply(q, pn), qi)
+    pp = np.array([qpqi[1],\
+                   qpqi[2],\
+                   qpqi[3],\
+                   ])
+    return pp
+
+
+def quaternionMultiply(a, b):
+    return np.array([a[0]*b[0] - a[1]*b[1] - a[2]*b[2] - a[3]*b[3],\
+                     a[0]*b[1] + a[1]*b[0] + a[2]*b[3] - a[3]*b[2],\
+                     a[0]*b[2] - a[1]*b[3] + a[2]*b[0] + a[3]*b[1],\
+                     a[0]*b[3] + a[1]*b[2] - a[2]*b[1] + a[3]*b[0],\
+                     ])
+
+
+def rotationQuaternion(theta, v):
+    ct = cos(theta/2)
+    st = sin(theta/2)
+    q = np.array([ct,\
+                  st*v[0],\
+                  st*v[1],\
+                  st*v[2],\
+                  ])
+    return q
+
+
+def normalizeBasis(f, l, u):
+    # f = forward
+    fsq = np.dot(f,f)
+    # l = left
+    l = l - f*(np.dot(l,f)/fsq)
+    lsq = np.dot(l,l)
+    # u = up
+    u = u - f*(np.dot(l,f)/fsq) - l*(np.dot(u,l)/lsq)
+    usq = np.dot(u,u)
+    # normalize
+    f = f/sqrt(fsq)
+    l = l/sqrt(lsq)
+    u = u/sqrt(usq)
+    return f, l, u
+
+
+def hackedRotate(q, p):
+    k = np.array([- q[1]*p[0] - q[2]*p[1] - q[3]*p[2],
+                  + q[0]*p[0] + q[2]*p[2] - q[3]*p[1],
+                  + q[0]*p[1] - q[1]*p[2] + q[3]*p[0],
+                  + q[0]*p[2] + q[1]*p[1] - q[2]*p[0],
+                  ])
+    return np.array([- k[0]*q[1] + k[1]*q[0] - k[2]*q[3] + k[3]*q[2],
+                     - k[0]*q[2] + k[1]*q[3] + k[2]*q[0] - k[3]*q[1],
+                     - k[0]*q[3] - k[1]*q[2] + k[2]*q[1] + k[3]*q[0],
+                     ])
+
+
+def rotateBasisAngleVector(f, l, u, theta, v):
+    q = rotationQuaternion(theta, v)
+    f = hackedRotate(q, f)
+    l = hackedRotate(q, l)
+    u = hackedRotate(q, u)
+    return normalizeBasis(f, l, u)
+
+
+def rotateBasisQuaternion(f, l, u, q):
+    f = hackedRotate(q, f)
+    l = hackedRotate(q, l)
+    u = hackedRotate(q, u)
+    return normalizeBasis(f, l, u)
+
+
+def rotateBasis(f, l, u, t, v=None):
+    if v is None:
+        return rotateBasisQuaternion(f, l, u, t)
+    return rotateBasisAngleVector(f, l, u, t, v)
@@ -0,0 +1,1627 @@
+"""
+Headless 4D maze scene: maze state, movement, camera and geometry
+
+Geometry layers (maze, goal, cube, hint, trail, map) are NumPy buffers:
+    <layer>Vertices : (n, 3) float32
+    <layer>Colors   : (n, 4) float32
+    <layer>Mode     : QUADS or TRIANGLES
+A renderer only has to draw them, see maze4d.render. In multi-view, views
+holds the maze, goal, cube and hint layers of each of the four 3D sections.
+In the tesseract overview, overview holds every slice along the hidden
+dimension side by side, and overviewMarkers the player, goal and highlight.
+The maze layer is also split into chunks, see maze4d.culling:
+    mazeChunkFirst, mazeChunkCount : first vertex and vertices of each chunk
+    mazeChunkBoxes                 : (n, 2, 3) chunk bounding boxes
+and mazeDrawOrder gives its back-to-front order for the current camera.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from random import Random, randrange
+from math import pi, sqrt
+# installed
+import numpy as np
+# local
+from .constants import STEP, MAX_STEPS, FOV, NEAR, FAR, CHUNK_SIZE, LOD_RADIUS, TURNING, DEG, BLOCK_BIT, VISIT_BIT, MAX_FILTER_TRIES, HISTORY_SIZE, TRAIL_SIZE
+from .controls import HELD_ACTIONS
+from .culling import chunkIndex, chunkRanges, noChunks, chunkMesh, frustumPlanes, visibleBoxes, viewBucket, drawOrder
+from .history import History, Trail, MOVE, SWAP, CROSS_SECTION
+from . import kernels
+from .openmask import DIRECTIONS, openBit, buildOpenMask, updateOpenMask
+from .rotation import rotationQuaternion, rotateBasis
+from .slicing import SLICE_SPEED, buildSliceTable, sliceHyperplane
+from .timing import PhaseTimer, timed
+from .tracing import TRACER, traced
+
+################################################################################
+# GEOMETRY CONSTANTS
+
+# primitives, by vertices per primitive
+TRIANGLES = 3
+QUADS     = 4
+
+# unit cube faces in view axes, in the order x-, x+, y-, y+, z-, z+
+FACE_QUADS = np.array([[[0,0,0], [0,0,1], [0,1,1], [0,1,0]],
+                       [[1,0,0], [1,1,0], [1,1,1], [1,0,1]],
+                       [[0,0,0], [1,0,0], [1,0,1], [0,0,1]],
+                       [[0,1,0], [0,1,1], [1,1,1], [1,1,0]],
+                       [[0,0,0], [0,1,0], [1,1,0], [1,0,0]],
+                       [[0,0,1], [1,0,1], [1,1,1], [0,1,1]],
+                       ])
+
+# tesseract overview: cells between slices, and the tint of the box around
+# the player's slice
+OVERVIEW_GAP       = 2
+OVERVIEW_HIGHLIGHT = [0.3, 0.5, 1.0, 0.2]
+
+# breadcrumb trail: marker inside each cell left behind, in view axes, and
+# the color of the newest one, older ones fading out
+TRAIL_MARKER = 0.35 + 0.3*FACE_QUADS
+TRAIL_COLOR  = [0.2, 0.2, 0.2, 0.8]
+
+# viewed dimensions of each multi-view section, by hidden dimension, as
+# dimensionSwap makes them from the starting view
+VIEW_AXES = (np.array([3,1,2,0]),
+             np.array([0,3,2,1]),
+             np.array([0,1,3,2]),
+             np.array([0,1,2,3]),
+             )
+
+
+def viewFaces(dims):
+    # open mask bits of the faces x-, x+, y-, y+, z-, z+ in the view axes dims
+    return [2*dims[k//2] + k%2 for k in range(6)]
+
+
+def coarseWalls(walls):
+    # 2x2x2 blocks of a 3D wall array that are at least half walls, blocks
+    # past an odd edge only counting the cells they cover
+    shape = -(-np.array(walls.shape)//2)
+    blocks = tuple(2*shape)
+    merged = np.zeros(blocks, 'int8')
+    covered = np.zeros(blocks, 'int8')
+    merged[tuple(slice(n) for n in walls.shape)] = walls
+    covered[tuple(slice(n) for n in walls.shape)] = 1
+    split = (shape[0],2, shape[1],2, shape[2],2)
+    return 2*merged.reshape(split).sum(axis=(1,3,5)) >= covered.reshape(split).sum(axis=(1,3,5))
+
+
+def buffers(vertices, colors):
+    # flat vertex and color lists as (n, 3) and (n, 4) float32 arrays
+    return (np.array(vertices, 'float32').reshape(-1,3),
+            np.array(colors, 'float32').reshape(-1,4))
+
+
+################################################################################
+# MAZE SCENE
+
+class MazeScene:
+    def __init__(self, width=640, height=480, timer=None, size=(5,5,5,5), seed=None):
+        # viewport size, used to lay out the map
+        self.width  = width
+        self.height = height
+        # maze size for every new maze
+        self.mazeSize = list(size)
+        # every new maze continues one random sequence, so a seed and the
+        # actions taken reproduce a whole session
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.random = Random(self.seed)
+        # input recorder, see maze4d.replay
+        self.recorder = None
+        # 3D section only shows wall faces the player can get next to
+        self.reachableOnly = False
+        # test a new maze must pass besides being solvable, called with the
+        # scene, see maze4d.metrics.difficultyFilter, and whether the last
+        # maze passed it or was kept after MAX_FILTER_TRIES
+        self.mazeFilter = None
+        self.filterPassed = True
+        # all four 3D sections at once, one per hidden dimension, each a
+        # dict of its viewed dimensions 'd' and its layers as (vertices,
+        # colors) QUADS buffers
+        self.multiView = False
+        self.views = None
+        # maze chunks inside and outside the view frustum at the last draw
+        self.chunksDrawn  = 0
+        self.chunksCulled = 0
+        # 3D section only in full detail near the player, with the chunk
+        # meshes of the current slice kept while the player moves in it
+        self.levelOfDetail = False
+        self.detailCache = None
+        # every slice along the hidden dimension at once, laid out in a grid,
+        # built per dimensionSwap, see generateOverview
+        self.overview = False
+        # moves, swaps and cross-section changes of this maze, to undo
+        self.history = History(HISTORY_SIZE)
+        # cells the player left, shown in the single view's cross-section
+        self.trail = Trail(TRAIL_SIZE)
+        self.showTrail = True
+        # back-to-front maze orders by camera bucket, for the mesh in 'mesh'
+        self.drawOrders = {'mesh': None}
+        self.timer = timer if timer is not None else PhaseTimer()
+        # held actions survive regenerating the maze
+        self.heldActions = set()
+        self.actions = {'x+'                     : (self.move, (0, +1)),
+                        'x-'                     : (self.move, (0, -1)),
+                        'y+'                     : (self.move, (1, +1)),
+                        'y-'                     : (self.move, (1, -1)),
+                        'z+'                     : (self.move, (2, +1)),
+                        'z-'                     : (self.move, (2, -1)),
+                        'w+'                     : (self.move, (3, +1)),
+                        'w-'                     : (self.move, (3, -1)),
+                        'exclude x'              : (self.dimensionSwap, (0,)),
+                        'exclude y'              : (self.dimensionSwap, (1,)),
+                        'exclude z'              : (self.dimensionSwap, (2,)),
+                        'exclude w'              : (self.dimensionSwap, (3,)),
+                        'cross-sections'         : (self.cycleCrossSection, (+1,)),
+                        'previous cross-section' : (self.cycleCrossSection, (-1,)),
+                        'smooth cross-section'   : (self.toggleSmoothSlice, ()),
+                        'reachable walls only'   : (self.toggleReachableOnly, ()),
+                        'multi-view'             : (self.toggleMultiView, ()),
+                        'level of detail'        : (self.toggleLevelOfDetail, ()),
+                        'overview'               : (self.toggleOverview, ()),
+                        'hints'                  : (self.toggleHint, ()),
+                        'trail'                  : (self.toggleTrail, ()),
+                        'undo'                   : (self.undo, ()),
+                        'rewind'                 : (self.rewind, ()),
+                        'regenerate'             : (self.regenerate, ()),
+                        }
+        self.startScene()
+
+
+    @traced('startScene')
+    def startScene(self):
+        for progress, stage in self.startSteps():
+            pass
+
+
+    def startSteps(self):
+        # startScene a stage at a time, yielding the progress (0 to 1) and
+        # the stage starting, so that it can run in the background
+        # maze, only solvable ones count as tries of mazeFilter
+        builds = 1
+        tries = 0
+        yield 0.0, 'building maze'
+        self.buildMaze(self.mazeSize)
+        yield 0.6, 'solving maze'
+        while True:
+            if self.solveMaze():
+                tries += 1
+                if self.acceptMaze(tries):
+                    break
+            builds += 1
+            yield 0.0, 'building maze (try {})'.format(builds)
+            self.buildMaze(self.mazeSize)
+            yield 0.6, 'solving maze (try {})'.format(builds)
+
+        # set viewed dimensions
+        self.d = np.array([0,1,2,3])
+        # set view
+        self.rotY = 0.0
+        self.rotZ = 0.0
+        #
+        v = np.array([1,1,1])/sqrt(3)
+        theta = 2*pi/3
+        self.quaternion = rotationQuaternion(theta, v)
+        #
+        self.rotationalMomentum = 0
+        self.relativeVector = np.array([0,1])
+        #
+        self.forward = np.array([1,0,0])
+        self.left    = np.array([0,1,0])
+        self.up      = np.array([0,0,1])
+        # cross section of 4D: 3D, 3D, 1D
+        self.crossSection = 3
+        # smooth 3D cross-section along the hidden dimension
+        self.smoothSlice = False
+        self.sliceTable = None
+        self.sliceW = self.position[self.d[3]] + 0.5
+        # hint
+        self.hint = True
+        self.history.clear()
+        self.trail.clear()
+        yield 0.7, 'meshing'
+        self.generateLayers()
+        # fixed-step simulation time not yet run
+        self.lag = 0.0
+        yield 1.0, 'ready'
+
+
+    def generateLayers(self):
+        # every geometry layer of the current view mode
+        self.generateMaze()
+        self.generateGoal()
+        self.generateCube()
+        self.generateHint()
+        self.generateTrail()
+        self.setMapSizes()
+        self.generateMap()
+        if self.multiView:
+            self.generateViews()
+            self.generateViewHints()
+        if self.overview:
+            self.generateOverview()
+            self.generateOverviewMarkers()
+
+
+    def endScene(self):
+        pass
+
+
+    def acceptMaze(self, tries):
+        # solvable maze passes mazeFilter, or the filter was tried long enough
+        self.filterPassed = self.mazeFilter is None or self.mazeFilter(self)
+        return self.filterPassed or tries >= MAX_FILTER_TRIES
+
+
+    def regenerate(self):
+        self.endScene()
+        self.startScene()
+
+
+    def animating(self):
+        # anything that changes without input
+        return bool(self.heldActions) or\
+               self.rotationalMomentum != 0 or\
+               self.victory or\
+               (self.sweepingSlice() and self.sliceW != self.position[self.d[3]] + 0.5)
+
+
+    def sweepingSlice(self):
+        # the smooth cross-section is shown, so update sweeps sliceW to the
+        # player's slice, otherwise move sets it at once
+        return self.smoothSlice and self.crossSection == 3 and not (self.multiView or self.overview)
+
+
+    def advance(self, dt):
+        # fixed timestep, dropping time after long stalls
+        # returns the number of simulation steps run
+        self.lag = min(self.lag + dt, MAX_STEPS*STEP)
+        steps = 0
+        while self.lag >= STEP:
+            self.update(STEP)
+            self.lag -= STEP
+            steps += 1
+        if self.recorder is not None:
+            self.recorder.tick(dt, steps)
+        return steps
+
+
+    @timed('update')
+    def update(self, dt):
+        self.heldKeys(dt)
+        if self.victory:
+            self.rotZ = (self.rotZ + TURNING*dt*(2/3))%360.0
+            self.rotY -= dt*self.rotY/15
+        # sweep smooth cross-section towards the current slice
+        target = self.position[self.d[3]] + 0.5
+        if self.sliceW != target:
+            step = SLICE_SPEED*dt
+            if abs(target - self.sliceW) <= step:
+                self.sliceW = target
+            else:
+                self.sliceW += step if target > self.sliceW else -step
+            if self.sweepingSlice():
+                self.generateMaze()
+        # quaternion
+        relativeVector = self.relativeVector[0]*self.up + self.relativeVector[1]*self.left
+        self.forward, self.left, self.up = rotateBasis(self.forward, 
+                                                       self.left, 
+                                                       self.up, 
+                                                       self.rotationalMomentum, 
+                                                       relativeVector)
+
+
+    def doAction(self, action):
+        if self.recorder is not None:
+            self.recorder.action(action)
+        if action in HELD_ACTIONS:
+            self.heldActions.add(action)
+        else:
+            function, args = self.actions[action]
+            function(*args)
+
+
+    def releaseAction(self, action):
+        if self.recorder is not None:
+            self.recorder.release(action)
+        self.heldActions.discard(action)
+
+
+    def releaseAll(self):
+        if self.recorder is not None:
+            self.recorder.releaseAll()
+        self.heldActions.clear()
+
+
+    def startDrag(self):
+        # grab the maze, stopping any spin
+        if self.recorder is not None:
+            self.recorder.startDrag()
+        self.rotationalMomentum = 0
+        self.relativeVector = np.array([0,1])
+
+
+    def drag(self, dx, dy):
+        # spin the maze by a mouse drag, in pixels
+        if self.recorder is not None:
+            self.recorder.drag(dx, dy)
+        self.rotZ = (self.rotZ + 180.0*dx/self.mazeWidth)%360.0
+        self.rotY = (self.rotY + 180.0*dy/self.mazeHeight)%360.0
+        # quaternion
+        dsqrt = sqrt(dx*dx + dy*dy)
+        self.rotationalMomentum = TURNING*DEG*dsqrt/(self.mazeWidth)
+        self.relativeVector = np.array([-dx, -dy])/dsqrt
+
+
+    def checkVictory(self):
+            # check victory condition
+            self.victory = True
+            for i in range(len(self.position)):
+                self.victory &= self.position[i] == self.goal[i]
+
+
+    @traced('move')
+    def move(self, i, d, record=True):
+        # check for wall or boundary
+        if self.openMask[tuple(self.position)] & openBit(i, d):
+            # move
+            self.trail.push(self.position)
+            self.position = np.array(self.position)
+            self.position[i] += d
+            if record:
+                self.history.push(MOVE, 2*i + (d > 0))
+            if not self.sweepingSlice():
+                self.sliceW = self.position[self.d[3]] + 0.5
+
+            # re-generate changed graphics
+            if self.overview:
+                # every slice is already built, only the markers move
+                self.generateOverviewMarkers()
+            elif self.multiView:
+                # only the section hiding i moves to another slice
+                self.generateViews([i])
+            else:
+                if i == self.d[3]:
+                    # smooth cross-section is swept by update instead
+                    if not (self.smoothSlice and self.crossSection == 3):
+                        self.generateMaze()
+                    self.generateGoal()
+                elif self.levelOfDetail and self.crossSection == 3 and not self.smoothSlice:
+                    # same slice, only chunks crossing the radius change
+                    self.generateMaze()
+                self.generateCube()
+                self.generateTrail()
+            self.generateMap()
+
+            # check whether reached goal
+            self.checkVictory()
+
+
+    @traced('dimensionSwap')
+    def dimensionSwap(self, dim, record=True):
+        i = np.where(self.d==dim)[0][0]
+        if i != 3:
+            if record:
+                self.history.push(SWAP, self.d[3])
+            temp = self.d[i]
+            self.d[i] = self.d[3]
+            self.d[3] = temp
+            self.sliceTable = None
+            self.sliceW = self.position[self.d[3]] + 0.5
+            if self.overview:
+                self.generateOverview()
+                self.generateOverviewMarkers()
+                self.generateMap()
+                return
+            if self.multiView:
+                # every section is already built, only the highlight moves
+                self.generateMap()
+                return
+            self.generateMaze()
+            self.generateGoal()
+            self.generateCube()
+            self.generateHint()
+            self.generateTrail()
+            self.generateMap()
+
+
+    def cycleCrossSection(self, step, record=True):
+        # 3 -> 2 -> 1 -> 3 for step +1, reversed for step -1
+        if record:
+            self.history.push(CROSS_SECTION, step)
+        self.crossSection = (self.crossSection - 1 - step)%3 + 1
+        self.generateMaze()
+        self.generateTrail()
+
+
+    def undo(self):
+        # the newest delta, through the action that reverses it
+        delta = self.history.pop()
+        if delta is None:
+            return
+        kind, value = delta
+        if kind == MOVE:
+            i, d = DIRECTIONS[value]
+            self.move(i, -d, record=False)
+        elif kind == SWAP:
+            self.dimensionSwap(value, record=False)
+        else:
+            self.cycleCrossSection(-value, record=False)
+
+
+    @traced('rewind')
+    def rewind(self):
+        # every delta at once, back to the start of the maze, regenerating
+        # the geometry once instead of per delta or rebuilding the maze
+        deltas = self.history.popAll()
+        if not len(deltas):
+            return
+        kinds, values = deltas.T.astype('int')
+        moves = values[kinds == MOVE]
+        position = np.array(self.position)
+        np.add.at(position, moves//2, np.where(moves%2, -1, +1))
+        self.position = position
+        for dim in values[kinds == SWAP][::-1]:
+            i = np.where(self.d==dim)[0][0]
+            self.d[i], self.d[3] = self.d[3], dim
+        steps = values[kinds == CROSS_SECTION].sum()
+        self.crossSection = (self.crossSection - 1 + steps)%3 + 1
+        self.sliceTable = None
+        self.sliceW = self.position[self.d[3]] + 0.5
+        self.checkVictory()
+        self.generateLayers()
+
+
+    def toggleSmoothSlice(self):
+        self.smoothSlice = not self.smoothSlice
+        self.generateMaze()
+
+
+    def toggleReachableOnly(self):
+        self.reachableOnly = not self.reachableOnly
+        self.generateMaze()
+        if self.multiView:
+            self.generateViews()
+
+
+    def toggleOverview(self):
+        self.overview = not self.overview
+        if self.overview:
+            self.generateOverview()
+            self.generateOverviewMarkers()
+        elif not self.multiView:
+            # the single view was not kept current meanwhile
+            self.generateMaze()
+            self.generateGoal()
+            self.generateCube()
+            self.generateHint()
+            self.generateTrail()
+        else:
+            self.generateViews()
+
+
+    def toggleLevelOfDetail(self):
+        self.levelOfDetail = not self.levelOfDetail
+        self.generateMaze()
+
+
+    def toggleHint(self):
+        self.hint = not self.hint
+        self.generateHint()
+        if self.multiView:
+            self.generateViewHints()
+
+
+    def toggleTrail(self):
+        self.showTrail = not self.showTrail
+        self.generateTrail()
+
+
+    def toggleMultiView(self):
+        self.multiView = not self.multiView
+        if self.multiView:
+            self.generateViews()
+            self.generateViewHints()
+        else:
+            # the single view was not kept current meanwhile
+            self.generateMaze()
+            self.generateGoal()
+            self.generateCube()
+            self.generateHint()
+            self.generateTrail()
+
+
+    def heldKeys(self, dt):
+        if not self.heldActions:
+            return
+        if 'turn right' in self.heldActions:
+            self.rotZ = (self.rotZ - TURNING*dt)%360.0
+            # self.quaternion
+            quaternion = rotationQuaternion(-TURNING*dt*DEG, self.up)
+            self.forward, self.left, self.up = rotateBasis(self.forward, self.left, self.up, quaternion)
+        if 'turn left' in self.heldActions:
+            self.rotZ = (self.rotZ + TURNING*dt)%360.0
+            # self.quaternion
+            quaternion = rotationQuaternion(+TURNING*dt*DEG, self.up)
+            self.forward, self.left, self.up = rotateBasis(self.forward, self.left, self.up, quaternion)
+        if 'turn up' in self.heldActions:
+            self.rotY = (self.rotY - TURNING*dt)%360.0
+            # quaternion
+            quaternion = rotationQuaternion(-TURNING*dt*DEG, self.left)
+            self.forward, self.left, self.up = rotateBasis(self.forward, self.left, self.up, quaternion)
+        if 'turn down' in self.heldActions:
+            self.rotY = (self.rotY + TURNING*dt)%360.0
+            # quaternion
+            quaternion = rotationQuaternion(+TURNING*dt*DEG, self.left)
+            self.forward, self.left, self.up = rotateBasis(self.forward, self.left, self.up, quaternion)
+
+
+    def resize(self, width, height):
+        if self.recorder is not None:
+            self.recorder.resize(width, height)
+        self.width  = width
+        self.height = height
+        self.setMapSizes()
+        self.generateMap()
+
+
+    def setMapSizes(self):
+        # position of map and maze
+        if self.width > self.height:
+            # wide
+            mapWidth  = self.width//3
+            mapHeight = self.height
+            self.mazeX          = self.width//3
+            self.mazeY          = 0
+            self.mazeWidth      = 2*self.width//3
+            self.mazeHeight     = self.height
+        else:
+            # tall
+            mapWidth  = self.width
+            mapHeight = self.height//3
+            self.mazeX          = 0
+            self.mazeY          = self.height//3
+            self.mazeWidth      = self.width
+            self.mazeHeight     = 2*self.height//3
+        mapMin = mapWidth if mapWidth < mapHeight else mapHeight
+        self.mapX           = abs(mapWidth  - mapMin)//2
+        self.mapY           = abs(mapHeight - mapMin)//2
+        self.mapWidth       = mapMin
+        self.mapHeight      = mapMin
+        # size of items in map
+        # remember, x and y go from -1 to 1 = 2
+        w = 2/(max(self.size)+3) # 0.5 spacer and 1 arrow on each side
+        h = 2/8 # 8 = 4 dimensions + 3 spaces between + 0.5 on each end
+        self.mapL            = w if w < h else h
+        self.mapE            = self.mapL/10 # border thickness
+        self.mapRedX         =  self.mapL*(self.size[0]/2) # +/-
+        self.mapRedY         = +self.mapL*3.5 # +0/-1
+        self.mapGreenX       =  self.mapL*(self.size[1]/2)
+        self.mapGreenY       = +self.mapL*1.5
+        self.mapBlueX        =  self.mapL*(self.size[2]/2)
+        self.mapBlueY        = -self.mapL*0.5
+        self.mapAlphaX       =  self.mapL*(self.size[3]/2)
+        self.mapAlphaY       = -self.mapL*2.5
+
+
+    def cameraLookAt(self, dims=None):
+        # eye, center and up of the orbit camera, in the view axes dims
+        # (default: the current view)
+        if dims is None:
+            dims = self.d
+        r = sqrt( self.size[0]*self.size[0] + self.size[1]*self.size[1] + self.size[2]*self.size[2] + self.size[3]*self.size[3] )
+        x = self.size[dims[0]]/2.0
+        y = self.size[dims[1]]/2.0
+        z = self.size[dims[2]]/2.0
+        center = np.array([x, y, z])
+        eye = center - r*self.forward
+        return eye, center, self.up
+
+
+    def overviewLookAt(self):
+        # eye, center and up of the orbit camera around the whole overview
+        low  = self.overviewOffsets.min(axis=0)
+        high = self.overviewOffsets.max(axis=0) + self.size[self.d[:3]]
+        center = (low + high)/2
+        # far enough for the bounding sphere to fit the field of view
+        r = np.linalg.norm(high - low)
+        eye = center - r*self.forward
+        return eye, center, self.up
+
+
+    @timed('generateCube')
+    @traced('generateCube')
+    def generateCube(self):
+        self.cubeMode = QUADS
+        self.cubeVertices, self.cubeColors = self.cubeBlock(self.d)
+        # convert to buffers
+        with TRACER.span('convert cube'):
+            self.cubeVertices = np.array(self.cubeVertices, 'float32').reshape(-1,3)
+            self.cubeColors   = np.array(self.cubeColors, 'float32').reshape(-1,4)
+
+
+    def cubeBlock(self, dims):
+        # player cube in the view axes dims, as vertex and color lists
+        vertices = []
+        colors   = []
+        x = self.position[dims[0]]
+        y = self.position[dims[1]]
+        z = self.position[dims[2]]
+        vertices.extend([#  XD
+                         x+0.1, y+0.1, z+0.1,
+                         x+0.1, y+0.1, z+0.9,
+                         x+0.1, y+0.9, z+0.9,
+                         x+0.1, y+0.9, z+0.1,
+                         #  YD
+                         x+0.1, y+0.1, z+0.1,
+                         x+0.9, y+0.1, z+0.1,
+                         x+0.9, y+0.1, z+0.9,
+                         x+0.1, y+0.1, z+0.9,
+                         #  ZD
+                         x+0.1, y+0.1, z+0.1,
+                         x+0.1, y+0.9, z+0.1,
+                         x+0.9, y+0.9, z+0.1,
+                         x+0.9, y+0.1, z+0.1,
+                         #  XU
+                         x+0.9, y+0.1, z+0.1,
+                         x+0.9, y+0.9, z+0.1,
+                         x+0.9, y+0.9, z+0.9,
+                         x+0.9, y+0.1, z+0.9,
+                         #  YU
+                         x+0.1, y+0.9, z+0.1,
+                         x+0.1, y+0.9, z+0.9,
+                         x+0.9, y+0.9, z+0.9,
+                         x+0.9, y+0.9, z+0.1,
+                         #  ZU
+                         x+0.1, y+0.1, z+0.9,
+                         x+0.9, y+0.1, z+0.9,
+                         x+0.9, y+0.9, z+0.9,
+                         x+0.1, y+0.9, z+0.9,
+                         ])
+        colors.extend([0.0, 0.0, 0.0, 1.0]*4*6)
+        return vertices, colors
+
+
+    @timed('generateGoal')
+    @traced('generateGoal')
+    def generateGoal(self):
+        self.goalMode = QUADS
+        self.goalVertices, self.goalColors = self.goalBlock(self.d, self.crossSection)
+        # convert to buffers
+        with TRACER.span('convert goal'):
+            self.goalVertices = np.array(self.goalVertices, 'float32').reshape(-1,3)
+            self.goalColors   = np.array(self.goalColors, 'float32').reshape(-1,4)
+
+
+    def goalBlock(self, dims, crossSection=None):
+        # goal cube in the view axes dims, if it is in the cross-section (or
+        # anywhere for None), as vertex and color lists
+        vertices = []
+        colors   = []
+        same = [self.position[i]==self.goal[i] for i in dims]
+        visible = crossSection is None or\
+                  (same[3] and
+                   ((crossSection == 3) or
+                    (crossSection == 2 and sum(same[:3]) >= 1) or
+                    (crossSection == 1 and sum(same[:3]) >= 2)))
+        if visible:
+            x = self.goal[dims[0]]
+            y = self.goal[dims[1]]
+            z = self.goal[dims[2]]
+            vertices.extend([#  XD
+                             x+0.2, y+0.2, z+0.2,
+                             x+0.2, y+0.2, z+1.0,
+                             x+0.2, y+1.0, z+1.0,
+                             x+0.2, y+1.0, z+0.2,
+                             #  YD
+                             x+0.2, y+0.2, z+0.2,
+                             x+1.0, y+0.2, z+0.2,
+                             x+1.0, y+0.2, z+1.0,
+                             x+0.2, y+0.2, z+1.0,
+                             #  ZD
+                             x+0.2, y+0.2, z+0.2,
+                             x+0.2, y+1.0, z+0.2,
+                             x+1.0, y+1.0, z+0.2,
+                             x+1.0, y+0.2, z+0.2,
+                             #  XU
+                             x+1.0, y+0.2, z+0.2,
+                             x+1.0, y+1.0, z+0.2,
+                             x+1.0, y+1.0, z+1.0,
+                             x+1.0, y+0.2, z+1.0,
+                             #  YU
+                             x+0.2, y+1.0, z+0.2,
+                             x+0.2, y+1.0, z+1.0,
+                             x+1.0, y+1.0, z+1.0,
+                             x+1.0, y+1.0, z+0.2,
+                             #  ZU
+                             x+0.2, y+0.2, z+1.0,
+                             x+1.0, y+0.2, z+1.0,
+                             x+1.0, y+1.0, z+1.0,
+                             x+0.2, y+1.0, z+1.0,
+                             ])
+            colors.extend([1.0, 0.4, 0.0, 1.0,
+                           1.0, 0.6, 0.0, 1.0,
+                           1.0, 0.8, 0.0, 1.0,
+                           1.0, 0.6, 0.0, 1.0,
+                          ]*3)
+            colors.extend([1.0, 0.6, 0.0, 1.0,
+                           1.0, 0.8, 0.0, 1.0,
+                           1.0, 1.0, 0.0, 1.0,
+                           1.0, 0.8, 0.0, 1.0,
+                          ]*3)
+        return vertices, colors
+
+
+    @timed('generateMaze')
+    @traced('generateMaze')
+    def generateMaze(self):
+        if self.smoothSlice and self.crossSection == 3:
+            self.generateSmoothSection()
+            return
+        self.mazeMode = QUADS
+        # draw 1D/2D/3D cross sections of 4D
+        if self.crossSection == 1:
+            self.generate1DSection()
+        elif self.crossSection == 2:
+            self.generate2DSection()
+        elif self.crossSection == 3:
+            self.generate3DSection()
+
+
+    def visibleMazeChunks(self, aspect):
+        # which maze chunks are inside the view frustum of the camera, for a
+        # viewport of the given aspect ratio
+        planes = frustumPlanes(*self.cameraLookAt(), FOV, aspect, NEAR, FAR)
+        visible = visibleBoxes(self.mazeChunkBoxes, planes)
+        self.chunksDrawn  = int(np.count_nonzero(visible))
+        self.chunksCulled = len(visible) - self.chunksDrawn
+        return visible
+
+
+    def mazeDrawOrder(self):
+        # vertex indices of the maze mesh back to front for the camera, the
+        # chunks in drawing order and the first index of every chunk, see
+        # maze4d.culling.drawOrder
+        # only built when the mesh changed or the camera moved into a bucket
+        # it was not built for yet
+        if self.drawOrders['mesh'] is not self.mazeVertices:
+            self.drawOrders = {'mesh': self.mazeVertices}
+        eye, center, up = self.cameraLookAt()
+        bucket = viewBucket(eye, (0,0,0), self.size[self.d[:3]])
+        if bucket not in self.drawOrders:
+            with TRACER.span('maze draw order'):
+                self.drawOrders[bucket] = drawOrder(self.mazeVertices, self.mazeMode,
+                                                    self.mazeChunkFirst, self.mazeChunkCount,
+                                                    self.mazeChunkBoxes, bucket)
+        return self.drawOrders[bucket]
+
+
+    @traced('generateSmoothSection')
+    def generateSmoothSection(self):
+        # the edge table only changes with the maze or the viewed dimensions
+        if self.sliceTable is None:
+            self.sliceTable = buildSliceTable(self.maze, self.d)
+        vertices = sliceHyperplane(self.sliceTable, self.sliceW)
+        # same coloring as generateBlocks, evaluated per vertex
+        p = np.empty((len(vertices),4), 'float32')
+        p[:,self.d[:3]] = vertices
+        p[:,self.d[3]] = self.sliceW
+        colors = np.empty((len(vertices),4), 'float32')
+        colors[:,:3] = (0.5+p[:,:3])/(self.size[:3]+2)
+        colors[:,3] = 1 - (p[:,3]-0.5)/(self.size[3]+2)
+        self.mazeMode = TRIANGLES
+        with TRACER.span('chunk maze'):
+            (self.mazeVertices,
+             self.mazeColors,
+             self.mazeChunkFirst,
+             self.mazeChunkCount,
+             self.mazeChunkBoxes) = chunkMesh(vertices, colors, TRIANGLES)
+
+
+    @traced('generate1DSection')
+    def generate1DSection(self):
+        # lines through the player along X, Y and Z
+        self.generateBlocks([self.sectionWalls([0], (False, True, True)),
+                             self.sectionWalls([1], (True, False, True)),
+                             self.sectionWalls([2], (True, True, False)),
+                             ])
+
+
+    @traced('generate2DSection')
+    def generate2DSection(self):
+        # planes through the player: XY, XZ and YZ
+        self.generateBlocks([self.sectionWalls([0,1], (False, False, True)),
+                             self.sectionWalls([0,2], (False, True, False)),
+                             self.sectionWalls([1,2], (True, False, False)),
+                             ])
+
+
+    @traced('generate3DSection')
+    def generate3DSection(self):
+        # the whole 3D slice at the player's hidden coordinate
+        if self.levelOfDetail:
+            self.generateDetailSection()
+            return
+        self.generateBlocks([self.sectionWalls([0,1,2], (True, True, True), self.reachableOnly)])
+
+
+    @traced('generateDetailSection')
+    def generateDetailSection(self):
+        # 3D slice meshed per chunk: chunks within LOD_RADIUS of the player as
+        # generate3DSection, farther ones as 2x2x2 blocks
+        # chunk meshes are kept until the slice changes, so a move inside the
+        # slice only meshes the chunks that cross the radius
+        key = (tuple(self.d), self.position[self.d[3]], self.reachableOnly)
+        if self.detailCache is None or self.detailCache['key'] != key:
+            index = list(self.position)
+            for k in range(3):
+                index[self.d[k]] = slice(None)
+            walls = self.maze[tuple(index)] & BLOCK_BIT
+            free = sorted(self.d[:3])
+            walls = walls.transpose([free.index(self.d[k]) for k in range(3)]) != 0
+            self.detailCache = {'key'    : key,
+                                'walls'  : walls,
+                                'coarse' : coarseWalls(walls),
+                                'meshes' : {},
+                                }
+        meshes = self.detailCache['meshes']
+        shape = np.array(self.detailCache['walls'].shape)
+        player = self.position[self.d[:3]] + 0.5
+        vertices = []
+        colors   = []
+        boxes    = []
+        for chunk in np.ndindex(*(-(-shape//CHUNK_SIZE))):
+            low  = CHUNK_SIZE*np.array(chunk)
+            high = np.minimum(low + CHUNK_SIZE, shape)
+            gap = np.maximum(0, np.maximum(low - player, player - high))
+            detail = bool(gap @ gap <= LOD_RADIUS*LOD_RADIUS)
+            if (chunk, detail) not in meshes:
+                meshes[chunk, detail] = self.chunkBlocks(low, high, detail)
+            chunkVertices, chunkColors = meshes[chunk, detail]
+            if len(chunkVertices):
+                vertices.append(chunkVertices)
+                colors.append(chunkColors)
+                boxes.append([low, high])
+        if not vertices:
+            self.mazeVertices = np.zeros((0,3), 'float32')
+            self.mazeColors   = np.zeros((0,4), 'float32')
+            self.mazeChunkFirst, self.mazeChunkCount, self.mazeChunkBoxes = noChunks()
+            return
+        counts = np.array([len(v) for v in vertices], 'int32')
+        self.mazeVertices   = np.concatenate(vertices)
+        self.mazeColors     = np.concatenate(colors)
+        self.mazeChunkFirst = (np.cumsum(counts) - counts).astype('int32')
+        self.mazeChunkCount = counts
+        self.mazeChunkBoxes = np.array(boxes, 'float32')
+
+
+    def chunkBlocks(self, low, high, detail):
+        # vertex and color buffers of the walls of one chunk of the view
+        # slice, from low to high in view axes, every wall or merged blocks
+        walls = self.detailCache['walls']
+        if detail:
+            found = np.argwhere(walls[low[0]:high[0], low[1]:high[1], low[2]:high[2]]) + low
+            cells = np.tile(self.position, (len(found), 1))
+            cells[:,self.d[:3]] = found
+            if self.reachableOnly:
+                faces = self.reachableNeighbors(cells)[:,viewFaces(self.d)]
+            else:
+                faces = np.ones((len(cells),6), bool)
+            return self.blockQuads(cells, faces, self.d)
+        # merged blocks, skipping faces between two blocks of this chunk
+        coarse = self.detailCache['coarse'][low[0]//2:-(-high[0]//2),
+                                            low[1]//2:-(-high[1]//2),
+                                            low[2]//2:-(-high[2]//2)]
+        padded = np.pad(coarse, 1)
+        blocks = np.argwhere(coarse)
+        faces = np.empty((len(blocks),6), bool)
+        for k in range(3):
+            for side in (0, 1):
+                neighbors = blocks + 1
+                neighbors[:,k] += 2*side - 1
+                faces[:,2*k+side] = ~padded[tuple(neighbors.T)]
+        found = low + 2*blocks
+        cells = np.tile(self.position, (len(found), 1))
+        cells[:,self.d[:3]] = found
+        return self.blockQuads(cells, faces, self.d, np.minimum(2, walls.shape - found))
+
+
+    def sectionWalls(self, axes, draw, reachable=False):
+        # wall cells of the section through the player along the given view
+        # axes, in view order, and which faces (x-, x+, y-, y+, z-, z+) to
+        # draw: every face along a draw axis, otherwise only faces between
+        # the wall and an open cell or the outside
+        # with reachable, only faces next to a cell the player can reach
+        index = list(self.position)
+        for k in axes:
+            index[self.d[k]] = slice(None)
+        walls = self.maze[tuple(index)] & BLOCK_BIT
+        free = sorted(self.d[k] for k in axes)
+        walls = walls.transpose([free.index(self.d[k]) for k in axes])
+        cells = np.tile(self.position, (np.count_nonzero(walls), 1))
+        cells[:,[self.d[k] for k in axes]] = np.argwhere(walls)
+        if reachable:
+            return cells, self.reachableNeighbors(cells)[:,viewFaces(self.d)]
+        mask = self.openMask[tuple(cells.T)]
+        faces = np.empty((len(cells),6), bool)
+        for k in range(3):
+            axis = self.d[k]
+            faces[:,2*k]   = draw[k] | (mask & openBit(axis, -1) != 0) | (cells[:,axis] == 0)
+            faces[:,2*k+1] = draw[k] | (mask & openBit(axis, +1) != 0) | (cells[:,axis] == self.size[axis]-1)
+        return cells, faces
+
+
+    def reachableNeighbors(self, cells):
+        # whether each neighbor of cells, in open mask bit order, is a cell
+        # the player can reach, as (n, 8) bools
+        seen = self.labelReachable()
+        reached = np.empty((len(cells),8), bool)
+        for bit, (axis, step) in enumerate(DIRECTIONS):
+            neighbors = cells.copy()
+            neighbors[:,axis] += step
+            inside = (neighbors[:,axis] >= 0) & (neighbors[:,axis] < self.size[axis])
+            neighbors[~inside,axis] = 0
+            reached[:,bit] = inside & seen[tuple(neighbors.T)]
+        return reached
+
+
+    def labelReachable(self):
+        # open cells the player can get to, labeled once per maze, with the
+        # wall faces kept and in total for reports, once per view
+        if self.reachable is None:
+            self.reachable = kernels.floodFill(self.openMask, self.position)
+        view = tuple(self.d)
+        if view not in self.reachableWalls:
+            self.reachableWalls[view] = self.reachableFaces()
+        return self.reachable
+
+
+    def reachableFaces(self):
+        # 3D wall faces over all slices of the current view, next to a
+        # reachable cell and in total
+        walls = (self.maze & BLOCK_BIT) != 0
+        kept = 0
+        for axis in self.d[:3]:
+            lower = [slice(None)]*4
+            upper = [slice(None)]*4
+            lower[axis] = slice(None, -1)
+            upper[axis] = slice(1, None)
+            lower = tuple(lower)
+            upper = tuple(upper)
+            kept += np.count_nonzero(walls[lower] & self.reachable[upper])
+            kept += np.count_nonzero(walls[upper] & self.reachable[lower])
+        return int(kept), 6*int(np.count_nonzero(walls))
+
+
+    def generateBlocks(self, sections):
+        # quads of the drawn faces of each (cells, faces) section, in order
+        # within each chunk
+        cells = np.concatenate([cells for cells, faces in sections])
+        faces = np.concatenate([faces for cells, faces in sections])
+        if not len(cells):
+            self.mazeVertices, self.mazeColors = self.blockQuads(cells, faces, self.d)
+            self.mazeChunkFirst, self.mazeChunkCount, self.mazeChunkBoxes = noChunks()
+            return
+        # chunk the cells, which are far fewer than the quads
+        index, low, span = chunkIndex(cells[:,self.d[:3]])
+        order = np.argsort(index, kind='stable')
+        cells = cells[order]
+        faces = faces[order]
+        self.mazeVertices, self.mazeColors = self.blockQuads(cells, faces, self.d)
+        (self.mazeChunkFirst,
+         self.mazeChunkCount,
+         self.mazeChunkBoxes) = chunkRanges(index[order], QUADS*faces.sum(axis=1), low, span)
+
+
+    def blockQuads(self, cells, faces, dims, extent=1):
+        # vertex and color buffers of the drawn faces (x-, x+, y-, y+, z-, z+
+        # in the view axes dims) of wall cells, or of boxes starting at cells
+        # with (n, 3) extents in view axes
+        block, face = np.nonzero(faces)
+        cells = cells[block]
+        if np.ndim(extent):
+            extent = extent[block][:,None,:]
+        # set graphical location and color of cube
+        corners = cells[:,dims[:3]][:,None,:] + extent*FACE_QUADS[face]
+        colors = np.empty((len(cells),4))
+        colors[:,:3] = (1+cells[:,:3])/(1+self.size[:3]+1)
+        colors[:,3] = 1 - cells[:,3]/(self.size[3]+2)
+        return (corners.reshape(-1,3).astype('float32'),
+                np.repeat(colors, 4, axis=0).astype('float32'))
+
+
+    @timed('generateViews')
+    @traced('generateViews')
+    def generateViews(self, hidden=(0,1,2,3)):
+        # 3D sections through the player hiding each dimension in hidden, and
+        # the goal and cube of every section
+        # the wall cells of all of them are gathered, and their faces
+        # culled, in one pass, so cells where sections cross are done once
+        if self.views is None:
+            self.views = [{'d': dims} for dims in VIEW_AXES]
+        planes = np.zeros(self.size, bool)
+        for h in hidden:
+            index = [slice(None)]*4
+            index[h] = self.position[h]
+            planes[tuple(index)] = True
+        cells = np.argwhere(planes & ((self.maze & BLOCK_BIT) != 0))
+        if self.reachableOnly:
+            faces = self.reachableNeighbors(cells)
+        else:
+            # as generate3DSection, every face of every wall
+            faces = np.ones((len(cells),8), bool)
+        for h in hidden:
+            dims = VIEW_AXES[h]
+            inside = cells[:,h] == self.position[h]
+            viewCells = cells[inside]
+            # same order as sectionWalls
+            order = np.lexsort((viewCells[:,dims[2]], viewCells[:,dims[1]], viewCells[:,dims[0]]))
+            self.views[h]['maze'] = self.blockQuads(viewCells[order],
+                                                    faces[inside][order][:,viewFaces(dims)],
+                                                    dims)
+        for view in self.views:
+            view['goal'] = buffers(*self.goalBlock(view['d'], 3))
+            view['cube'] = buffers(*self.cubeBlock(view['d']))
+
+
+    @timed('generateOverview')
+    @traced('generateOverview')
+    def generateOverview(self):
+        # every 3D slice along the hidden dimension in one pass: the outside
+        # faces of all walls, slice by slice, each slice moved to its place
+        # in the grid
+        order = [self.d[3]] + list(self.d[:3])
+        found = np.argwhere(((self.maze & BLOCK_BIT) != 0).transpose(order))
+        cells = np.empty_like(found)
+        cells[:,order] = found
+        mask = self.openMask[tuple(cells.T)]
+        faces = np.empty((len(cells),6), bool)
+        for k in range(3):
+            axis = self.d[k]
+            faces[:,2*k]   = (mask & openBit(axis, -1) != 0) | (cells[:,axis] == 0)
+            faces[:,2*k+1] = (mask & openBit(axis, +1) != 0) | (cells[:,axis] == self.size[axis]-1)
+        vertices, colors = self.blockQuads(cells, faces, self.d)
+        # vertex range and place of every slice
+        slices = self.size[self.d[3]]
+        counts = QUADS*np.bincount(found[:,0], faces.sum(axis=1), slices).astype('int32')
+        columns = int(np.ceil(np.sqrt(slices)))
+        spacing = self.size[self.d[:3]] + OVERVIEW_GAP
+        j = np.arange(slices)
+        # left to right, then top to bottom, as seen from the start
+        self.overviewOffsets = np.zeros((slices,3))
+        self.overviewOffsets[:,1] = -spacing[1]*(j%columns)
+        self.overviewOffsets[:,2] = -spacing[2]*(j//columns)
+        vertices += np.repeat(self.overviewOffsets, counts, axis=0).astype('float32')
+        self.overviewMode        = QUADS
+        self.overviewVertices    = vertices
+        self.overviewColors      = colors
+        self.overviewSliceFirst  = np.cumsum(counts) - counts
+        self.overviewSliceCount  = counts
+
+
+    def generateOverviewMarkers(self):
+        # player and goal in their slices, and a tinted box around the
+        # player's slice
+        offsets = self.overviewOffsets
+        vertices, colors = self.cubeBlock(self.d)
+        vertices = (np.reshape(vertices, (-1,3)) + offsets[self.position[self.d[3]]]).ravel().tolist()
+        goalVertices, goalColors = self.goalBlock(self.d)
+        vertices.extend((np.reshape(goalVertices, (-1,3)) + offsets[self.goal[self.d[3]]]).ravel())
+        colors.extend(goalColors)
+        low = offsets[self.position[self.d[3]]] - 0.25
+        extent = self.size[self.d[:3]] + 0.5
+        vertices.extend((low + extent*FACE_QUADS).ravel())
+        colors.extend(OVERVIEW_HIGHLIGHT*4*6)
+        self.overviewMarkersMode = QUADS
+        self.overviewMarkersVertices, self.overviewMarkersColors = buffers(vertices, colors)
+
+
+    def generateViewHints(self):
+        # hints of every multi-view section, they only change with the maze size
+        for view in self.views:
+            view['hint'] = buffers(*(self.hintBlock(view['d']) if self.hint else ([], [])))
+
+
+    def blockColor(self, x, y, z, w):
+        r = (1+x)/(1+self.size[0]+1)
+        g = (1+y)/(1+self.size[1]+1)
+        b = (1+z)/(1+self.size[2]+1)
+        a = 1 - (w)/(self.size[3]+4)
+        return r, g, b, a
+
+
+    def generateMapSegment(self, d, mapX, mapY):
+        l = self.mapL
+        e = self.mapE
+        # border
+        a = 0.3 if self.d[3] == d else 1.0
+        if d == 3:
+            color = [1.0, 1.0, 1.0, a]
+        else:
+            color = [0.0, 0.0, 0.0, a]
+            color[d] = 1.0
+        self.mapVertices.extend([-mapX-e, mapY  +e, +0.1,
+                                 -mapX-e, mapY-l-e, +0.1,
+                                  mapX+e, mapY-l-e, +0.1,
+                                  mapX+e, mapY  +e, +0.1,
+                                 # <-
+                                  mapX+(0.5)*l, mapY    , +0.1,
+                                  mapX+(0.5)*l, mapY-l  , +0.1,
+                                  mapX+(1.0)*l, mapY-l/2, +0.1,
+                                  mapX+(1.0)*l, mapY-l/2, +0.1,
+                                 # ->
+                                 -mapX-(0.5)*l, mapY    , +0.1,
+                                 -mapX-(1.0)*l, mapY-l/2, +0.1,
+                                 -mapX-(1.0)*l, mapY-l/2, +0.1,
+                                 -mapX-(0.5)*l, mapY-l  , +0.1,
+                                 ])
+        self.mapColors.extend([0.0, 0.0, 0.0, a]*2)
+        self.mapColors.extend(color*2)
+        self.mapColors.extend([0.0, 0.0, 0.0, a]*8)
+        # interior background (over border)
+        self.mapVertices.extend([ mapX, mapY  , 0.0,
+                                 -mapX, mapY  , 0.0,
+                                 -mapX, mapY-l, 0.0,
+                                  mapX, mapY-l, 0.0,
+                                 ])
+        self.mapColors.extend([1.0, 1.0, 1.0, 1.0]*4)
+        # cube
+        i = np.array(self.position) # easier to type and used for indexing blocks
+        self.mapVertices.extend([-mapX+(i[d]+0.1)*l, mapY-(0.1)*l, -0.2,
+                                 -mapX+(i[d]+0.1)*l, mapY-(0.9)*l, -0.2,
+                                 -mapX+(i[d]+0.9)*l, mapY-(0.9)*l, -0.2,
+                                 -mapX+(i[d]+0.9)*l, mapY-(0.1)*l, -0.2,
+                                 ])
+        self.mapColors.extend([0.0, 0.0, 0.0, 1.0]*4)
+        # goal
+        if (d == 0 or i[0] == self.goal[0]) and\
+           (d == 1 or i[1] == self.goal[1]) and\
+           (d == 2 or i[2] == self.goal[2]) and\
+           (d == 3 or i[3] == self.goal[3]):
+            self.mapVertices.extend([-mapX+(self.goal[d]+0.2)*l, mapY-(0.0)*l, -0.3,
+                                     -mapX+(self.goal[d]+0.2)*l, mapY-(0.8)*l, -0.3,
+                                     -mapX+(self.goal[d]+1.0)*l, mapY-(0.8)*l, -0.3,
+                                     -mapX+(self.goal[d]+1.0)*l, mapY-(0.0)*l, -0.3,
+                                     ])
+            self.mapColors.extend([1.0, 0.7, 0.0, 1.0,\
+                                   1.0, 0.4, 0.0, 1.0,\
+                                   1.0, 0.7, 0.0, 1.0,\
+                                   1.0, 1.0, 0.0, 1.0,\
+                                   ])
+        # blocks
+        for i[d] in range(self.size[d]):
+            if self.maze[i[0], i[1], i[2], i[3]] == 1:
+                r, g, b, a = self.blockColor(i[0], i[1], i[2], i[3])
+                self.mapVertices.extend([-mapX+(i[d]  )*l, mapY  , -0.1,
+                                         -mapX+(i[d]  )*l, mapY-l, -0.1,
+                                         -mapX+(i[d]+1)*l, mapY-l, -0.1,
+                                         -mapX+(i[d]+1)*l, mapY  , -0.1,
+                                         ])
+                self.mapColors.extend([r,g,b,a]*4)
+
+
+    @timed('generateMap')
+    @traced('generateMap')
+    def generateMap(self):
+        self.mapVertices = []
+        self.mapColors   = []
+        self.mapMode     = QUADS
+
+        self.generateMapSegment(d=0, mapX=self.mapRedX,   mapY=self.mapRedY)
+        self.generateMapSegment(d=1, mapX=self.mapGreenX, mapY=self.mapGreenY)
+        self.generateMapSegment(d=2, mapX=self.mapBlueX,  mapY=self.mapBlueY)
+        self.generateMapSegment(d=3, mapX=self.mapAlphaX, mapY=self.mapAlphaY)
+
+        # convert to buffers
+        with TRACER.span('convert map'):
+            self.mapVertices = np.array(self.mapVertices, 'float32').reshape(-1,3)
+            self.mapColors   = np.array(self.mapColors, 'float32').reshape(-1,4)
+
+
+    @timed('generateHint')
+    @traced('generateHint')
+    def generateHint(self):
+        self.hintMode = QUADS
+        if self.hint:
+            self.hintVertices, self.hintColors = self.hintBlock(self.d)
+        else:
+            self.hintVertices, self.hintColors = [], []
+        # convert to buffers
+        with TRACER.span('convert hint'):
+            self.hintVertices = np.array(self.hintVertices, 'float32').reshape(-1,3)
+            self.hintColors   = np.array(self.hintColors, 'float32').reshape(-1,4)
+
+
+    @timed('generateTrail')
+    @traced('generateTrail')
+    def generateTrail(self):
+        # a marker on every cell left behind that is in the cross-section,
+        # by the same rule as the goal, fading with age
+        self.trailMode = QUADS
+        cells, ages = self.trail.recent()
+        same = cells[:,self.d] == self.position[self.d]
+        shown = same[:,3] & (same[:,:3].sum(axis=1) >= 3 - self.crossSection) & self.showTrail
+        corners = cells[shown][:,self.d[:3]]
+        self.trailVertices = (corners[:,None,None,:] + TRAIL_MARKER).reshape(-1,3).astype('float32')
+        colors = np.tile(np.array(TRAIL_COLOR, 'float32'), (len(corners), 1))
+        colors[:,3] *= 1 - ages[shown]/TRAIL_SIZE
+        self.trailColors = np.repeat(colors, TRAIL_MARKER.size//3, axis=0)
+
+
+    def hintBlock(self, dims):
+        # axis arrows along the edges of the view axes dims, as vertex and
+        # color lists
+        vertices = []
+        colors   = []
+        h = 0.05
+        d = 0.1
+        x = self.size[dims[0]]
+        y = self.size[dims[1]]
+        z = self.size[dims[2]]
+        if dims[0] == 0:
+            colorX = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      ]
+        elif dims[0] == 1:
+            colorX = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      ]
+        elif dims[0] == 2:
+            colorX = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      ]
+        elif dims[0] == 3:
+            colorX = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      ]
+        if dims[1] == 0:
+            colorY = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      ]
+        elif dims[1] == 1:
+            colorY = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      ]
+        elif dims[1] == 2:
+            colorY = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      ]
+        elif dims[1] == 3:
+            colorY = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      ]
+        if dims[2] == 0:
+            colorZ = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      1.0, 0.0, 0.0, 1.0,
+                      ]
+        elif dims[2] == 1:
+            colorZ = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      0.0, 1.0, 0.0, 1.0,
+                      ]
+        elif dims[2] == 2:
+            colorZ = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      0.0, 0.0, 1.0, 1.0,
+                      ]
+        elif dims[2] == 3:
+            colorZ = [0.0, 0.0, 0.0, 1.0,
+                      0.0, 0.0, 0.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      1.0, 1.0, 1.0, 1.0,
+                      ]
+        vertices.extend([ -d  , -d-h, -d  ,
+                          -d-h, -d-h, -d-h,
+                         x+d+h, -d-h, -d-h,
+                         x+d  , -d-h, -d  ,
+                          -d  , -d  , -d  ,
+                          -d  , -d-h, -d  ,
+                         x+d  , -d-h, -d  ,
+                         x+d  , -d  , -d  ,
+                          -d  , -d  , -d-h,
+                          -d  , -d  , -d  ,
+                         x+d  , -d  , -d  ,
+                         x+d  , -d  , -d-h,
+                          -d-h, -d-h, -d-h,
+                          -d  , -d  , -d-h,
+                         x+d  , -d  , -d-h,
+                         x+d+h, -d-h, -d-h,
+                          -d  ,y+d  , -d  ,
+                          -d  ,y+d  , -d-h,
+                         x+d  ,y+d  , -d-h,
+                         x+d  ,y+d  , -d  ,
+                          -d  ,y+d+h, -d  ,
+                          -d  ,y+d  , -d  ,
+                         x+d  ,y+d  , -d  ,
+                         x+d  ,y+d+h, -d  ,
+                          -d-h,y+d+h, -d-h,
+                          -d  ,y+d+h, -d  ,
+                         x+d  ,y+d+h, -d  ,
+                         x+d+h,y+d+h, -d-h,
+                          -d  ,y+d  , -d-h,
+                          -d-h,y+d+h, -d-h,
+                         x+d+h,y+d+h, -d-h,
+                         x+d  ,y+d  , -d-h,
+                          -d-h, -d-h,z+d+h,
+                          -d  , -d-h,z+d  ,
+                         x+d  , -d-h,z+d  ,
+                         x+d+h, -d-h,z+d+h,
+                          -d  , -d  ,z+d+h,
+                          -d-h, -d-h,z+d+h,
+                         x+d+h, -d-h,z+d+h,
+                         x+d  , -d  ,z+d+h,
+                          -d  , -d  ,z+d  ,
+                          -d  , -d  ,z+d+h,
+                         x+d  , -d  ,z+d+h,
+                         x+d  , -d  ,z+d  ,
+                          -d  , -d-h,z+d  ,
+                          -d  , -d  ,z+d  ,
+                         x+d  , -d  ,z+d  ,
+                         x+d  , -d-h,z+d  ,
+                          -d  ,y+d  ,z+d+h,
+                          -d  ,y+d  ,z+d  ,
+                         x+d  ,y+d  ,z+d  ,
+                         x+d  ,y+d  ,z+d+h,
+                          -d-h,y+d+h,z+d+h,
+                          -d  ,y+d  ,z+d+h,
+                         x+d  ,y+d  ,z+d+h,
+                         x+d+h,y+d+h,z+d+h,
+                          -d  ,y+d+h,z+d  ,
+                          -d-h,y+d+h,z+d+h,
+                         x+d+h,y+d+h,z+d+h,
+                         x+d  ,y+d+h,z+d  ,
+                          -d  ,y+d  ,z+d  ,
+                          -d  ,y+d+h,z+d  ,
+                         x+d  ,y+d+h,z+d  ,
+                         x+d  ,y+d  ,z+d  ,
+                         ])
+        colors.extend(colorX*16)
+        vertices.extend([ -d  , -d  , -d-h,
+                          -d-h, -d-h, -d-h,
+                          -d-h,y+d+h, -d-h,
+                          -d  ,y+d  , -d-h,
+                          -d  , -d  , -d  ,
+                          -d  , -d  , -d-h,
+                          -d  ,y+d  , -d-h,
+                          -d  ,y+d  , -d  ,
+                          -d-h, -d  , -d  ,
+                          -d  , -d  , -d  ,
+                          -d  ,y+d  , -d  ,
+                          -d-h,y+d  , -d  ,
+                          -d-h, -d-h, -d-h,
+                          -d-h, -d  , -d  ,
+                          -d-h,y+d  , -d  ,
+                          -d-h,y+d+h, -d-h,
+                          -d  , -d  ,z+d  ,
+                          -d-h, -d  ,z+d  ,
+                          -d-h,y+d  ,z+d  ,
+                          -d  ,y+d  ,z+d  ,
+                          -d  , -d  ,z+d+h,
+                          -d  , -d  ,z+d  ,
+                          -d  ,y+d  ,z+d  ,
+                          -d  ,y+d  ,z+d+h,
+                          -d-h, -d-h,z+d+h,
+                          -d  , -d  ,z+d+h,
+                          -d  ,y+d  ,z+d+h,
+                          -d-h,y+d+h,z+d+h,
+                          -d-h, -d  ,z+d  ,
+                          -d-h, -d-h,z+d+h,
+                          -d-h,y+d+h,z+d+h,
+                          -d-h,y+d  ,z+d  ,
+                         x+d+h, -d-h, -d-h,
+                         x+d  , -d  , -d-h,
+                         x+d  ,y+d  , -d-h,
+                         x+d+h,y+d+h, -d-h,
+                         x+d+h, -d  , -d  ,
+                         x+d+h, -d-h, -d-h,
+                         x+d+h,y+d+h, -d-h,
+                         x+d+h,y+d  , -d  ,
+                         x+d  , -d  , -d  ,
+                         x+d+h, -d  , -d  ,
+                         x+d+h,y+d  , -d  ,
+                         x+d  ,y+d  , -d  ,
+                         x+d  , -d  , -d-h,
+                         x+d  , -d  , -d  ,
+                         x+d  ,y+d  , -d  ,
+                         x+d  ,y+d  , -d-h,
+                         x+d+h, -d  ,z+d  ,
+                         x+d  , -d  ,z+d  ,
+                         x+d  ,y+d  ,z+d  ,
+                         x+d+h,y+d  ,z+d  ,
+                         x+d+h, -d-h,z+d+h,
+                         x+d+h, -d  ,z+d  ,
+                         x+d+h,y+d  ,z+d  ,
+                         x+d+h,y+d+h,z+d+h,
+                         x+d  , -d  ,z+d+h,
+                         x+d+h, -d-h,z+d+h,
+                         x+d+h,y+d+h,z+d+h,
+                         x+d  ,y+d  ,z+d+h,
+                         x+d  , -d  ,z+d  ,
+                         x+d  , -d  ,z+d+h,
+                         x+d  ,y+d  ,z+d+h,
+                         x+d  ,y+d  ,z+d  ,
+                         ])
+        colors.extend(colorY*16)
+        vertices.extend([ -d-h, -d  , -d  ,
+                          -d-h, -d-h, -d-h,
+                          -d-h, -d-h,z+d+h,
+                          -d-h, -d  ,z+d  ,
+                          -d  , -d  , -d  ,
+                          -d-h, -d  , -d  ,
+                          -d-h, -d  ,z+d  ,
+                          -d  , -d  ,z+d  ,
+                          -d  , -d-h, -d  ,
+                          -d  , -d  , -d  ,
+                          -d  , -d  ,z+d  ,
+                          -d  , -d-h,z+d  ,
+                          -d-h, -d-h, -d-h,
+                          -d  , -d-h, -d  ,
+                          -d  , -d-h,z+d  ,
+                          -d-h, -d-h,z+d+h,
+                         x+d  , -d  , -d  ,
+                         x+d  , -d-h, -d  ,
+                         x+d  , -d-h,z+d  ,
+                         x+d  , -d  ,z+d  ,
+                         x+d+h, -d  , -d  ,
+                         x+d  , -d  , -d  ,
+                         x+d  , -d  ,z+d  ,
+                         x+d+h, -d  ,z+d  ,
+                         x+d+h, -d-h, -d-h,
+                         x+d+h, -d  , -d  ,
+                         x+d+h, -d  ,z+d  ,
+                         x+d+h, -d-h,z+d+h,
+                         x+d  , -d-h, -d  ,
+                         x+d+h, -d-h, -d-h,
+                         x+d+h, -d-h,z+d+h,
+                         x+d  , -d-h,z+d  ,
+                          -d-h,y+d+h, -d-h,
+                          -d-h,y+d  , -d  ,
+                          -d-h,y+d  ,z+d  ,
+                          -d-h,y+d+h,z+d+h,
+                          -d  ,y+d+h, -d  ,
+                          -d-h,y+d+h, -d-h,
+                          -d-h,y+d+h,z+d+h,
+                          -d  ,y+d+h,z+d  ,
+                          -d  ,y+d  , -d  ,
+                          -d  ,y+d+h, -d  ,
+                          -d  ,y+d+h,z+d  ,
+                          -d  ,y+d  ,z+d  ,
+                          -d-h,y+d  , -d  ,
+                          -d  ,y+d  , -d  ,
+                          -d  ,y+d  ,z+d  ,
+                          -d-h,y+d  ,z+d  ,
+                         x+d  ,y+d+h, -d  ,
+                         x+d  ,y+d  , -d  ,
+                         x+d  ,y+d  ,z+d  ,
+                         x+d  ,y+d+h,z+d  ,
+                         x+d+h,y+d+h, -d-h,
+                         x+d  ,y+d+h, -d  ,
+                         x+d  ,y+d+h,z+d  ,
+                         x+d+h,y+d+h,z+d+h,
+                         x+d+h,y+d  , -d  ,
+                         x+d+h,y+d+h, -d-h,
+                         x+d+h,y+d+h,z+d+h,
+                         x+d+h,y+d  ,z+d  ,
+                         x+d  ,y+d  , -d  ,
+                         x+d+h,y+d  , -d  ,
+                         x+d+h,y+d  ,z+d  ,
+                         x+d  ,y+d  ,z+d  ,
+                         ])
+        colors.extend(colorZ*16)
+        return vertices, colors
+
+
+    @traced('buildMaze')
+    def buildMaze(self, size=[5,5,5,5]):
+        # build maze
+        self.size = np.array(size,'int')
+        self.maze = np.zeros(self.size, 'int')
+        p = 0.3 # probability of wall
+        for i in range(self.size[0]):
+            for j in range(self.size[1]):
+                for k in range(self.size[2]):
+                    for h in range(self.size[3]):
+                        self.maze[i,j,k,h] = BLOCK_BIT if self.random.random() > p else 0
+        # set goal
+        self.goal = self.size-1
+        # remove wall from goal (if applicable)
+        self.maze[self.goal[0], self.goal[1], self.goal[2], self.goal[3]] = 0
+        # set user at start
+        self.position = np.zeros(4, 'int') #np.array([4,4,4,0])
+        # remove wall from start (if applicable)
+        self.maze[self.position[0], self.position[1], self.position[2], self.position[3]] = 0
+        # set victory status
+        self.victory = False
+        self.checkVictory()
+        # neighbor openness, for movement, culling and solving
+        self.openMask = buildOpenMask(self.maze)
+        self.reachable = None
+        self.reachableWalls = {}
+        self.detailCache = None
+
+
+    def setCell(self, cell, wall):
+        # change one cell, keeping openMask current
+        cell = tuple(cell)
+        self.maze[cell] = (self.maze[cell] & ~BLOCK_BIT) | (BLOCK_BIT if wall else 0)
+        updateOpenMask(self.openMask, self.maze, cell)
+        self.sliceTable = None
+        self.reachable = None
+        self.reachableWalls = {}
+        self.detailCache = None
+
+
+    @traced('solveMaze')
+    def solveMaze(self):
+        # depth-first search through open neighbors until the goal, marking
+        # visited cells
+        visited = kernels.floodFill(self.openMask, self.position, self.goal)
+        self.maze[visited] |= VISIT_BIT
+        return bool(visited[tuple(self.goal)])
+
+
+    @traced('shortestPath')
+    def shortestPath(self):
+        # shortest route from the player to the goal as (n, 4) cells, both
+        # included, None when the goal cannot be reached
+        route = kernels.bidirectionalSearch(self.openMask, self.position, self.goal)
+        if route is None:
+            return None
+        return np.array(np.unravel_index(route, self.size)).T
+
+
+################################################################################
+# MAZE SIZES
+
+def parseSize(text):
+    # '20' -> 20x20x20x20, '50x50x50x4' -> as given
+    size = [int(n) for n in text.lower().split('x')]
+    if len(size) == 1:
+        size = size*4
+    if len(size) != 4:
+        raise ValueError('size must be N or AxBxCxD: {}'.format(text))
+    return size
+
+
+def sizeName(size):
+    return 'x'.join(str(n) for n in size)
+
+
+def prepareScene(scene, size, seed, maxTries=None):
+    # fresh solvable maze of the given size, as in startScene
+    # returns False if maxTries builds were not solvable
+    scene.random.seed(seed)
+    scene.buildMaze(size)
+    tries = 1
+    while not scene.solveMaze():
+        if maxTries is not None and tries >= maxTries:
+            return False
+        scene.buildMaze(size)
+        tries += 1
+    scene.maze &= BLOCK_BIT
+    scene.sliceTable = None
+    scene.sliceW = scene.position[scene.d[3]] + 0.5
+    scene.setMapSizes()
+    return True
@@ -0,0 +1,342 @@
+"""
+Game-session server: many headless mazes played at once over a socket
+
+Every session is a maze of its own, built like MazeScene.startScene from a
+size and seed, and played with the moves and dimension swaps of the game.
+Session state lives in NumPy arrays, one row per session, with every open
+mask (see maze4d.openmask) in one shared buffer. Requests arriving in the
+same event loop iteration, from any connection, are handled as one batch:
+the moves of all sessions are checked against their open masks at once, by
+the same rule as MazeScene.move.
+
+USAGE:
+    python -m maze4d.server                         # TCP on localhost:4404
+    python -m maze4d.server --unix /tmp/maze4d.sock
+    python -m maze4d.loadgen --connections 50       # see maze4d.loadgen
+
+PROTOCOL (little-endian, 16-byte frames both ways, pipelining allowed):
+    request  : op (uint8), arg (uint8), tag (uint16), session (uint32),
+               seed (uint32), size (4 x uint8)
+    response : op (uint8), status (uint8), tag (uint16), session (uint32),
+               position (4 x uint8), dims (4 x uint8)
+A response echoes the op and tag of its request, responses on a connection
+come in request order. dims are the viewed dimensions, the last one hidden.
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import asyncio
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .openmask import DIRECTIONS
+from .scene import MazeScene, prepareScene
+
+################################################################################
+# PROTOCOL
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 4404
+
+# limits of a NEW request, so no single maze can stall or exhaust the server
+MAX_CELLS = 1 << 20 # cells of one maze, 32^4
+MAX_TRIES = 100     # builds of one maze before it is given up as unsolvable
+
+REQUEST_DTYPE  = np.dtype([('op', 'u1'), ('arg', 'u1'), ('tag', '<u2'), ('session', '<u4'),
+                           ('seed', '<u4'), ('size', 'u1', 4)])
+RESPONSE_DTYPE = np.dtype([('op', 'u1'), ('status', 'u1'), ('tag', '<u2'), ('session', '<u4'),
+                           ('position', 'u1', 4), ('dims', 'u1', 4)])
+FRAME = REQUEST_DTYPE.itemsize
+
+# ops, with the meaning of arg
+NEW   = 0 # new session from seed and size, the response has its id, a
+          # size over MAX_CELLS or unsolvable in MAX_TRIES is a bad request
+MOVE  = 1 # arg: open mask bit, axis arg//2 down if even, up if odd
+SWAP  = 2 # arg: dimension to hide, as MazeScene.dimensionSwap
+STATE = 3
+CLOSE = 4
+
+# statuses
+OK          = 0
+BLOCKED     = 1 # move into a wall or the boundary, the player stays
+VICTORY     = 2 # the player is at the goal
+NO_SESSION  = 3 # unknown or closed session
+BAD_REQUEST = 4
+
+STATUS_NAMES = {OK          : 'ok',
+                BLOCKED     : 'blocked',
+                VICTORY     : 'victory',
+                NO_SESSION  : 'no session',
+                BAD_REQUEST : 'bad request',
+                }
+
+DIRECTION_AXIS = np.array([axis for axis, step in DIRECTIONS])
+DIRECTION_STEP = np.array([step for axis, step in DIRECTIONS])
+
+# a session id is its row in the low bits and the row's generation above,
+# so ids of closed sessions do not reach the next session in the row
+SLOT_BITS = 20
+SLOT_MASK = (1 << SLOT_BITS) - 1
+GENERATIONS = 1 << (32 - SLOT_BITS)
+
+################################################################################
+# SESSIONS
+
+class SessionStore:
+    # state of every session, rows are reused after CLOSE
+    def __init__(self, capacity=1024):
+        # builds mazes, its geometry is never used
+        self.scene = MazeScene()
+        self.count = 0
+        self.positions   = np.zeros((capacity, 4), 'int64')
+        self.goals       = np.zeros((capacity, 4), 'int64')
+        self.dims        = np.zeros((capacity, 4), 'uint8')
+        self.strides     = np.zeros((capacity, 4), 'int64')
+        self.bases       = np.zeros(capacity, 'int64')
+        self.cells       = np.zeros(capacity, 'int64')
+        self.generations = np.zeros(capacity, 'uint32')
+        self.alive       = np.zeros(capacity, bool)
+        # open masks of all rows, a row keeps its part when closed and is
+        # only reused for a maze of as many cells
+        self.masks = np.zeros(capacity*625, 'uint8')
+        self.masksUsed = 0
+        self.freeRows = {} # cells -> closed rows
+
+
+    def grow(self):
+        for name in ('positions', 'goals', 'dims', 'strides', 'bases', 'cells', 'generations', 'alive'):
+            array = getattr(self, name)
+            grown = np.zeros((2*len(array),) + array.shape[1:], array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+
+    def create(self, size, seed):
+        # new session, returns its id
+        if min(size) < 1 or np.prod(size) > MAX_CELLS:
+            raise ValueError('maze size out of range: {}'.format(size))
+        if not prepareScene(self.scene, size, seed, MAX_TRIES):
+            raise ValueError('no solvable maze in {} tries: {}'.format(MAX_TRIES, size))
+        mask = self.scene.openMask
+        free = self.freeRows.get(mask.size)
+        if free:
+            row = free.pop()
+        else:
+            if self.count == SLOT_MASK + 1:
+                raise MemoryError('no more than {} sessions'.format(SLOT_MASK + 1))
+            row = self.count
+            self.count += 1
+            if row == len(self.alive):
+                self.grow()
+            if self.masksUsed + mask.size > len(self.masks):
+                masks = np.zeros(max(2*len(self.masks), self.masksUsed + mask.size), 'uint8')
+                masks[:self.masksUsed] = self.masks[:self.masksUsed]
+                self.masks = masks
+            self.bases[row] = self.masksUsed
+            self.cells[row] = mask.size
+            self.masksUsed += mask.size
+        self.masks[self.bases[row]:self.bases[row] + mask.size] = mask.ravel()
+        self.strides[row] = np.array(mask.strides)//mask.itemsize
+        self.positions[row] = self.scene.position
+        self.goals[row] = self.scene.goal
+        self.dims[row] = (0, 1, 2, 3)
+        self.alive[row] = True
+        return int(self.generations[row]) << SLOT_BITS | row
+
+
+    def close(self, rows):
+        for row in rows:
+            self.alive[row] = False
+            self.generations[row] = (self.generations[row] + 1)%GENERATIONS
+            self.freeRows.setdefault(int(self.cells[row]), []).append(row)
+
+
+    def rows(self, sessions):
+        # row of each session id, -1 for unknown or closed sessions
+        rows = (sessions & SLOT_MASK).astype('int64')
+        known = rows < self.count
+        rows[~known] = 0
+        known &= self.alive[rows] & (self.generations[rows] == sessions >> SLOT_BITS)
+        return np.where(known, rows, -1)
+
+
+    def move(self, rows, bits):
+        # moves that are open, every row at most once, returns which were
+        positions = self.positions[rows]
+        cells = self.bases[rows] + (positions*self.strides[rows]).sum(axis=1)
+        legal = ((self.masks[cells] >> bits) & 1).astype(bool)
+        positions[legal, DIRECTION_AXIS[bits[legal]]] += DIRECTION_STEP[bits[legal]]
+        self.positions[rows] = positions
+        return legal
+
+
+    def swap(self, rows, dims):
+        # hide dims, the viewed dimension hiding it is swapped into its place
+        d = self.dims[rows]
+        i = np.argmax(d == dims[:,None], axis=1)
+        everyRow = np.arange(len(rows))
+        d[everyRow, i] = d[:,3]
+        d[:,3] = dims
+        self.dims[rows] = d
+
+
+    def victory(self, rows):
+        return (self.positions[rows] == self.goals[rows]).all(axis=1)
+
+
+################################################################################
+# SERVER
+
+class MazeServer:
+    # handles the requests of every connection a batch at a time
+    def __init__(self, store=None):
+        self.store = store if store is not None else SessionStore()
+        # (writer, requests) received since the last batch
+        self.pending = []
+        self.requests = 0
+        self.batches = 0
+
+
+    async def handle(self, reader, writer):
+        # one connection: frames are queued for the next batch as they come
+        buffer = b''
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                frames = len(buffer)//FRAME*FRAME
+                if not frames:
+                    continue
+                if not self.pending:
+                    asyncio.get_running_loop().call_soon(self.runBatch)
+                self.pending.append((writer, np.frombuffer(buffer[:frames], REQUEST_DTYPE)))
+                buffer = buffer[frames:]
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    def runBatch(self):
+        pending, self.pending = self.pending, []
+        requests = np.concatenate([frames for writer, frames in pending])
+        try:
+            responses = self.respond(requests)
+        except Exception as error:
+            # every request still gets a response, none of them is retried
+            print('batch of {} requests failed: {!r}'.format(len(requests), error))
+            responses = np.zeros(len(requests), RESPONSE_DTYPE)
+            responses['op']  = requests['op']
+            responses['tag'] = requests['tag']
+            responses['session'] = requests['session']
+            responses['status'] = BAD_REQUEST
+        first = 0
+        for writer, frames in pending:
+            if not writer.is_closing():
+                writer.write(responses[first:first + len(frames)].tobytes())
+            first += len(frames)
+        self.requests += len(requests)
+        self.batches += 1
+
+
+    def respond(self, requests):
+        # responses to a batch of requests, in the same order
+        store = self.store
+        responses = np.zeros(len(requests), RESPONSE_DTYPE)
+        responses['op']  = requests['op']
+        responses['tag'] = requests['tag']
+        responses['session'] = requests['session']
+        responses['status'] = BAD_REQUEST
+        # new sessions, one maze at a time
+        for i in np.flatnonzero(requests['op'] == NEW):
+            try:
+                responses['session'][i] = store.create(requests['size'][i].tolist(), int(requests['seed'][i]))
+                responses['status'][i] = OK
+            except (ValueError, MemoryError):
+                pass
+        # requests of one session are handled in order: the k-th request of
+        # every session is in the k-th turn
+        ops = np.flatnonzero((requests['op'] > NEW) & (requests['op'] <= CLOSE))
+        order = ops[np.argsort(requests['session'][ops], kind='stable')]
+        sessions = requests['session'][order]
+        starts = np.r_[True, sessions[1:] != sessions[:-1]]
+        turn = np.arange(len(order)) - np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))
+        for k in range(turn.max() + 1 if len(turn) else 0):
+            self.respondTurn(requests, responses, order[turn == k])
+        return responses
+
+
+    def respondTurn(self, requests, responses, indices):
+        # requests at indices, each of a different session
+        store = self.store
+        rows = store.rows(requests['session'][indices])
+        responses['status'][indices[rows < 0]] = NO_SESSION
+        indices, rows = indices[rows >= 0], rows[rows >= 0]
+        ops  = requests['op'][indices]
+        args = requests['arg'][indices].astype('int64')
+        status = np.full(len(indices), OK, 'uint8')
+        moves = (ops == MOVE) & (args < 8)
+        status[ops == MOVE] = BAD_REQUEST
+        status[moves] = np.where(store.move(rows[moves], args[moves]), OK, BLOCKED)
+        swaps = (ops == SWAP) & (args < 4)
+        status[ops == SWAP] = BAD_REQUEST
+        status[swaps] = OK
+        store.swap(rows[swaps], args[swaps].astype('uint8'))
+        status[(status == OK) & store.victory(rows)] = VICTORY
+        responses['status'][indices] = status
+        responses['position'][indices] = store.positions[rows]
+        responses['dims'][indices] = store.dims[rows]
+        store.close(rows[ops == CLOSE])
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, report=5.0):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+        print('serving on {}'.format(unix))
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print('serving on {}:{}'.format(host, port))
+    async with listener:
+        while True:
+            requests, batches, start = server.requests, server.batches, time.perf_counter()
+            await asyncio.sleep(report)
+            if server.requests > requests:
+                elapsed = time.perf_counter() - start
+                print('{:8} sessions {:10.0f} requests/s {:8.1f} requests/batch'.format(
+                      int(server.store.alive.sum()),
+                      (server.requests - requests)/elapsed,
+                      (server.requests - requests)/(server.batches - batches)))
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze game-session server')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='TCP host (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='TCP port (default: %(default)s)')
+    parser.add_argument('--unix', metavar='PATH',
+                        help='serve on a Unix socket at PATH instead of TCP')
+    parser.add_argument('--report', type=float, default=5.0,
+                        help='seconds between throughput reports (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(MazeServer(), args.host, args.port, args.unix, args.report))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
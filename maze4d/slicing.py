@@ -0,0 +1,118 @@
+"""
+Smooth hyperplane cross-sections of the 4D maze
+"""
+
+################################################################################
+# INCLUDES
+
+# installed
+import numpy as np
+# local
+from .constants import BLOCK_BIT
+
+################################################################################
+# HYPERPLANE SLICING
+
+# Slicing axis-aligned tesseracts along the hidden axis only ever gives whole
+# cubes, so the smooth cross-section slices the wall occupancy sampled at cell
+# centers instead. Between two hidden-axis samples the occupancy is linearly
+# interpolated, and the 0.5 level of the sliced field is extracted with
+# marching tetrahedra.
+
+# cube corners, numbered by bits (x=1, y=2, z=4)
+CUBE_CORNERS = np.array([[(c>>0)&1, (c>>1)&1, (c>>2)&1] for c in range(8)])
+# six tetrahedra around the 0-7 diagonal
+CUBE_TETRAHEDRA = np.array([[0,1,3,7],
+                            [0,3,2,7],
+                            [0,2,6,7],
+                            [0,6,4,7],
+                            [0,4,5,7],
+                            [0,5,1,7],
+                            ])
+# isosurface level between open (0) and wall (1)
+SLICE_LEVEL = 0.5
+# hidden-axis sweep speed (cells per second)
+SLICE_SPEED = 4.0
+
+
+def buildTetrahedronTable():
+    # case = bit k set when tetrahedron vertex k is inside (wall)
+    # each case yields up to 2 triangles, each triangle is 3 edges (vertex pairs)
+    # winding is fixed afterwards, so the order within a triangle is free
+    # sign = +1 when the first edge runs from inside to outside, -1 otherwise
+    count = np.zeros(16, 'int')
+    edges = np.zeros((16,2,3,2), 'int')
+    sign = np.ones(16, 'float32')
+    for case in range(16):
+        inside  = [k for k in range(4) if case & (1<<k)]
+        outside = [k for k in range(4) if not case & (1<<k)]
+        if len(inside) in (1,3):
+            lone, others = (inside[0], outside) if len(inside) == 1 else (outside[0], inside)
+            count[case] = 1
+            edges[case,0] = [(lone, o) for o in others]
+            sign[case] = 1 if len(inside) == 1 else -1
+        elif len(inside) == 2:
+            a, b = inside
+            c, d = outside
+            count[case] = 2
+            edges[case,0] = [(a,c), (a,d), (b,d)]
+            edges[case,1] = [(a,c), (b,d), (b,c)]
+    return count, edges, sign
+
+
+TETRAHEDRON_COUNT, TETRAHEDRON_EDGES, TETRAHEDRON_SIGN = buildTetrahedronTable()
+
+
+def buildSliceTable(maze, d):
+    # walls sampled at cell centers, ordered (hidden, x, y, z) in view axes
+    # padded with open cells so the outer walls are closed
+    walls = np.transpose((maze & BLOCK_BIT) != 0, d[[3,0,1,2]]).astype('float32')
+    volume = np.pad(walls, 1)
+    n = volume.shape[1:]
+    # sample positions in view space (cell i has its center at i+0.5)
+    grid = np.indices(n).reshape(3,-1).T.astype('float32') - 0.5
+    # flat sample indices of every tetrahedron corner
+    cubes = np.indices([m-1 for m in n]).reshape(3,-1).T
+    base = (cubes[:,0]*n[1] + cubes[:,1])*n[2] + cubes[:,2]
+    offsets = CUBE_CORNERS @ np.array([n[1]*n[2], n[2], 1])
+    tetrahedra = (base[:,None] + offsets)[:,CUBE_TETRAHEDRA].reshape(-1,4)
+    # keep only tetrahedra that can cross the level in some slice
+    flat = volume.reshape(volume.shape[0],-1)
+    high = flat.max(axis=0)[tetrahedra].max(axis=1)
+    low  = flat.min(axis=0)[tetrahedra].min(axis=1)
+    tetrahedra = tetrahedra[(high >= SLICE_LEVEL) & (low < SLICE_LEVEL)]
+    return flat, grid, tetrahedra
+
+
+def sliceHyperplane(table, w):
+    # triangles of the hyperplane cross-section at hidden coordinate w
+    flat, grid, tetrahedra = table
+    # interpolate between the two bracketing slices (slab 0 is padding)
+    s = w + 0.5
+    k = min(max(int(np.floor(s)), 0), len(flat)-2)
+    t = float(min(max(s - k, 0.0), 1.0))
+    field = (1-t)*flat[k] + t*flat[k+1]
+    values = field[tetrahedra]
+    inside = values >= SLICE_LEVEL
+    case = inside @ np.array([1,2,4,8])
+    count = TETRAHEDRON_COUNT[case]
+    triangles = []
+    for n in range(2):
+        sel = np.nonzero(count > n)[0]
+        corners = tetrahedra[sel]
+        edges = TETRAHEDRON_EDGES[case[sel], n]
+        rows = np.arange(len(sel))[:,None]
+        a = corners[rows, edges[:,:,0]]
+        b = corners[rows, edges[:,:,1]]
+        fa = field[a]
+        fb = field[b]
+        p = grid[a] + ((SLICE_LEVEL-fa)/(fb-fa))[:,:,None]*(grid[b]-grid[a])
+        # wind counter-clockwise when seen from the open side
+        # the field is linear in a tetrahedron, so any inside to outside edge
+        # points out of the surface
+        out = TETRAHEDRON_SIGN[case[sel]][:,None]*(grid[b[:,0]]-grid[a[:,0]])
+        normal = np.cross(p[:,1]-p[:,0], p[:,2]-p[:,0])
+        flip = (normal*out).sum(1) < 0
+        p[flip] = p[flip][:,::-1]
+        triangles.append(p)
+    return np.concatenate(triangles).reshape(-1,3).astype('float32')
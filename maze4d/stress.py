@@ -0,0 +1,248 @@
+"""
+Scaling stress report: memory and latency against maze size
+
+Each size runs in its own process so that its peak memory is not hidden by
+the sizes before it. For every size the report lists the peak resident set
+size, the bytes of the maze array, the build and solve time, the vertex count
+and meshing time of every cross-section mode and the generateMap time, then
+names the first size where any phase takes longer than one frame (1/FPS).
+
+USAGE:
+    python -m maze4d.stress
+    python -m maze4d.stress --sizes 5 10 20 50x50x50x4 --out stress.json
+    python -m maze4d.stress --plot stress.png       # needs matplotlib
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import argparse
+import json
+import subprocess
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .bench import timeFunction
+from .constants import DEFAULT_SEED, FPS, STEP
+from .scene import MazeScene, parseSize, sizeName
+
+################################################################################
+# STRESS
+
+DEFAULT_SIZES = ['5', '10', '15', '20', '25', '30', '50x50x50x4']
+DEFAULT_TIMEOUT = 600 # seconds per size
+
+# cross-section modes: name -> (crossSection, smoothSlice, reachableOnly,
+# levelOfDetail)
+MESH_MODES = {'1D'        : (1, False, False, False),
+              '2D'        : (2, False, False, False),
+              '3D'        : (3, False, False, False),
+              'reachable' : (3, False, True, False),
+              'detail'    : (3, False, False, True),
+              'smooth'    : (3, True, False, False),
+              }
+
+
+def peakMemory():
+    # peak resident set size of this process in bytes, None if unknown
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else 1024*peak
+
+
+def measureSize(size, seed=DEFAULT_SEED, repeat=1):
+    # one size in this process, returns a dict of measurements
+    scene = MazeScene()
+    scene.random.seed(seed)
+    phases = {}
+    vertices = {}
+    # build and solve, timing the attempt that was solvable
+    attempts = 0
+    while True:
+        attempts += 1
+        start = time.perf_counter()
+        scene.buildMaze(size)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        solved = scene.solveMaze()
+        solve = time.perf_counter() - start
+        if solved:
+            break
+    phases['buildMaze'] = build
+    phases['solveMaze'] = solve
+    scene.sliceTable = None
+    scene.sliceW = scene.position[scene.d[3]] + 0.5
+    scene.setMapSizes()
+    # meshing, the first smooth section also builds its slice table, and
+    # every detail section starts with no chunk meshes kept, as a new slice
+    def mesh():
+        scene.detailCache = None
+        scene.generateMaze()
+    for mode, (crossSection, smoothSlice, reachableOnly, levelOfDetail) in MESH_MODES.items():
+        scene.crossSection = crossSection
+        scene.smoothSlice = smoothSlice
+        scene.reachableOnly = reachableOnly
+        scene.levelOfDetail = levelOfDetail
+        if smoothSlice:
+            start = time.perf_counter()
+            scene.generateMaze()
+            phases['sliceTable'] = time.perf_counter() - start
+        phases['mesh ' + mode] = timeFunction(mesh, repeat)['median']
+        vertices[mode] = len(scene.mazeVertices)
+    phases['generateMap'] = timeFunction(scene.generateMap, repeat)['median']
+    return {'size'      : list(size),
+            'attempts'  : attempts,
+            'mazeBytes' : scene.maze.nbytes,
+            'peakRSS'   : peakMemory(),
+            'phases'    : phases,
+            'vertices'  : vertices,
+            }
+
+
+def runSize(size, seed, repeat, timeout):
+    # measureSize in a child process, None if it failed or timed out
+    command = [sys.executable, '-m', 'maze4d.stress', '--child',
+               '--sizes', sizeName(size),
+               '--seed', str(seed),
+               '--repeat', str(repeat),
+               ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True,
+                                timeout=timeout, check=True)
+    except subprocess.TimeoutExpired:
+        print('{}: timed out after {} s'.format(sizeName(size), timeout))
+        return None
+    except subprocess.CalledProcessError as error:
+        print('{}: failed\n{}'.format(sizeName(size), error.stderr))
+        return None
+    # the results are the last line, after anything the scene printed
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def firstOverBudget(results, budget=STEP):
+    # first result with a phase over budget, and those phases
+    for result in results:
+        over = [phase for phase, seconds in result['phases'].items() if seconds > budget]
+        if over:
+            return result, over
+    return None, []
+
+
+def formatBytes(n):
+    if n is None:
+        return '?'
+    for unit in ('B', 'kB', 'MB'):
+        if n < 1024:
+            return '{:.0f} {}'.format(n, unit)
+        n /= 1024
+    return '{:.1f} GB'.format(n)
+
+
+def printTable(results):
+    phases = list(results[0]['phases'])
+    modes = list(results[0]['vertices'])
+    print('{:<14}{:>10}{:>10}'.format('size', 'peak RSS', 'maze'), end='')
+    print(''.join('{:>15}'.format(mode + ' vtx') for mode in modes))
+    for result in results:
+        print('{:<14}{:>10}{:>10}'.format(sizeName(result['size']),
+                                          formatBytes(result['peakRSS']),
+                                          formatBytes(result['mazeBytes'])), end='')
+        print(''.join('{:>15}'.format(result['vertices'][mode]) for mode in modes))
+    print()
+    print('{:<14}'.format('ms'), end='')
+    print(''.join('{:>16}'.format(phase) for phase in phases))
+    for result in results:
+        print('{:<14}'.format(sizeName(result['size'])), end='')
+        print(''.join('{:>15.2f}{}'.format(1000*result['phases'][phase],
+                                              '*' if result['phases'][phase] > STEP else ' ')
+                      for phase in phases))
+    print('* over the {:.1f} ms frame budget ({:g} FPS)'.format(1000*STEP, FPS))
+
+
+def plotResults(results, path):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print('matplotlib is needed for --plot')
+        return
+    cells = [int(np.prod(result['size'])) for result in results]
+    figure, (timeAxes, memoryAxes) = plt.subplots(1, 2, figsize=(12, 5))
+    for phase in results[0]['phases']:
+        timeAxes.loglog(cells, [1000*result['phases'][phase] for result in results],
+                        marker='o', label=phase)
+    timeAxes.axhline(1000*STEP, color='k', linestyle='--', label='frame budget')
+    timeAxes.set_xlabel('cells')
+    timeAxes.set_ylabel('ms')
+    timeAxes.legend(fontsize='small')
+    if all(result['peakRSS'] for result in results):
+        memoryAxes.loglog(cells, [result['peakRSS']/2**20 for result in results],
+                          marker='o', label='peak RSS')
+    memoryAxes.loglog(cells, [result['mazeBytes']/2**20 for result in results],
+                      marker='o', label='maze array')
+    memoryAxes.set_xlabel('cells')
+    memoryAxes.set_ylabel('MB')
+    memoryAxes.legend(fontsize='small')
+    figure.tight_layout()
+    figure.savefig(path)
+    print('plot written to {}'.format(path))
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze scaling stress report')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='maze sizes, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='maze seed (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per meshing measurement (default: %(default)s)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='seconds allowed per size (default: %(default)s)')
+    parser.add_argument('--out', metavar='PATH',
+                        help='write JSON results to PATH')
+    parser.add_argument('--plot', metavar='PATH',
+                        help='plot time and memory against cells to PATH')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    sizes = [parseSize(s) for s in args.sizes]
+    if args.child:
+        print(json.dumps(measureSize(sizes[0], args.seed, args.repeat)))
+        return 0
+
+    results = []
+    for size in sizes:
+        result = runSize(size, args.seed, args.repeat, args.timeout)
+        if result is None:
+            break
+        results.append(result)
+    if not results:
+        return 1
+    printTable(results)
+    result, over = firstOverBudget(results)
+    if result is not None:
+        print('first over budget: {} ({})'.format(sizeName(result['size']), ', '.join(over)))
+    else:
+        print('every phase fits the frame budget')
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=1)
+    if args.plot:
+        plotResults(results, args.plot)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
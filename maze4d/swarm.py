@@ -0,0 +1,230 @@
+"""
+Bot swarm: many simple agents walking a maze at once
+
+Agent positions are an (N, 4) int array advanced a step at a time with
+vectorized checks against the maze's open mask, the same rule as
+MazeScene.move. Each maze of a batch is walked by every policy, and the
+report gives the steps each policy needed to reach the goal, compared to the
+shortest route, and the agent-steps per second simulated.
+
+POLICIES:
+    random : step to a random open neighbor
+    wall   : follow walls, each agent turning through the 4 axes in its own
+             fixed order
+    greedy : step towards the goal by Manhattan distance, randomly now and
+             then so dead ends do not trap it
+
+USAGE:
+    python -m maze4d.swarm
+    python -m maze4d.swarm --size 10 --mazes 20 --agents 5000 --out swarm.json
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from itertools import permutations
+import argparse
+import json
+import sys
+import time
+# installed
+import numpy as np
+# local
+from .constants import DEFAULT_SEED
+from .openmask import DIRECTIONS
+from .scene import MazeScene, parseSize, prepareScene, sizeName
+
+################################################################################
+# POLICIES
+
+DIRECTION_AXIS = np.array([axis for axis, step in DIRECTIONS])
+DIRECTION_STEP = np.array([step for axis, step in DIRECTIONS])
+BITS = np.arange(8)
+
+# wall follower: directions to try from each heading, first open one wins
+#     turn right (next axis), straight, turn left, turn to the opposite
+#     axis, the same turns backwards, and back
+# every agent cycles through the axes in one of the 24 orders, so that not
+# all followers take the same route
+def followOrder(axes, h):
+    turns = [2*axes[(axes.index(h//2) + turn)%4] + (h%2 ^ back)
+             for back in (0, 1)
+             for turn in (1, 0, 3, 2)]
+    return [turns[i] for i in (0, 1, 2, 3, 4, 6, 7, 5)]
+
+
+FOLLOW_ORDERS = np.array([[followOrder(axes, h) for h in range(8)]
+                          for axes in permutations(range(4))])
+
+GREEDY_EPSILON = 0.1 # chance of a random step
+
+
+def openBits(open):
+    # (n,) open masks -> (n, 8) 0/1 per direction
+    return (open[:,None] >> BITS) & 1
+
+
+def randomWalk(swarm, agents, positions, open):
+    keys = swarm.rng.random((len(agents), 8))*openBits(open)
+    return np.argmax(keys, axis=1)
+
+
+def wallFollower(swarm, agents, positions, open):
+    candidates = FOLLOW_ORDERS[swarm.axisOrders[agents], swarm.headings[agents]]
+    first = np.argmax((open[:,None] >> candidates) & 1, axis=1)
+    directions = candidates[np.arange(len(agents)), first]
+    swarm.headings[agents] = directions
+    return directions
+
+
+def greedy(swarm, agents, positions, open):
+    # -1 for a step towards the goal, +1 away, random among the best
+    toward = np.sign(swarm.goal - positions)[:,DIRECTION_AXIS] == DIRECTION_STEP
+    score = np.where(toward, -1.0, 1.0) + 0.5*swarm.rng.random((len(agents), 8))
+    score[openBits(open) == 0] = np.inf
+    directions = np.argmin(score, axis=1)
+    explore = swarm.rng.random(len(agents)) < GREEDY_EPSILON
+    directions[explore] = randomWalk(swarm, agents[explore], positions[explore], open[explore])
+    return directions
+
+
+POLICIES = {'random' : randomWalk,
+            'wall'   : wallFollower,
+            'greedy' : greedy,
+            }
+
+################################################################################
+# SWARM
+
+class Swarm:
+    # agents of one policy walking one maze from the player's start
+    def __init__(self, scene, count, policy, rng):
+        self.mask = scene.openMask
+        self.goal = np.array(scene.goal)
+        self.policy = POLICIES[policy]
+        self.rng = rng
+        self.positions = np.tile(scene.position, (count, 1))
+        self.headings = rng.integers(0, 8, count)
+        self.axisOrders = rng.integers(0, len(FOLLOW_ORDERS), count)
+        self.steps = np.zeros(count, 'int')
+        self.done = (self.positions == self.goal).all(axis=1)
+
+
+    def step(self):
+        # moves every agent still walking, returns how many that was
+        agents = np.flatnonzero(~self.done)
+        positions = self.positions[agents]
+        open = self.mask[tuple(positions.T)]
+        directions = self.policy(self, agents, positions, open)
+        # a step into a wall or the boundary leaves the agent in place
+        legal = np.flatnonzero((open >> directions) & 1)
+        positions[legal, DIRECTION_AXIS[directions[legal]]] += DIRECTION_STEP[directions[legal]]
+        self.positions[agents] = positions
+        self.steps[agents] += 1
+        self.done[agents] = (positions == self.goal).all(axis=1)
+        return len(agents)
+
+
+    def run(self, maxSteps):
+        # returns the agent-steps simulated
+        total = 0
+        for _ in range(maxSteps):
+            if self.done.all():
+                break
+            total += self.step()
+        return total
+
+
+def runMaze(scene, size, seed, agents, policies, maxSteps):
+    # one maze walked by every policy, returns its results
+    prepareScene(scene, size, seed)
+    path = scene.shortestPath()
+    result = {'seed'     : seed,
+              'shortest' : len(path) - 1,
+              'policies' : {},
+              }
+    for name in policies:
+        swarm = Swarm(scene, agents, name, np.random.default_rng(seed))
+        start = time.perf_counter()
+        agentSteps = swarm.run(maxSteps)
+        elapsed = time.perf_counter() - start
+        steps = swarm.steps[swarm.done]
+        result['policies'][name] = {'solved'     : float(swarm.done.mean()),
+                                    'steps'      : np.percentile(steps, [50, 90, 100]).tolist() if len(steps) else None,
+                                    'agentSteps' : agentSteps,
+                                    'seconds'    : elapsed,
+                                    }
+    return result
+
+
+def runBatch(size, mazes, agents, policies, maxSteps, seed=DEFAULT_SEED, log=print):
+    scene = MazeScene()
+    results = []
+    for n in range(mazes):
+        result = runMaze(scene, size, seed + n, agents, policies, maxSteps)
+        results.append(result)
+        if log:
+            for name, stats in result['policies'].items():
+                steps = '{:8.0f}{:8.0f}{:8.0f}'.format(*stats['steps']) if stats['steps'] else '{:>24}'.format('-')
+                log('{:<6}{:>9}  {:<8}{:7.0%}{}{:12.2f}'.format(
+                    result['seed'], result['shortest'], name, stats['solved'], steps,
+                    stats['agentSteps']/stats['seconds']/1e6 if stats['seconds'] else 0))
+    return results
+
+
+def summarize(results, policies):
+    # per policy over the batch: solved fraction, median steps relative to
+    # the shortest route and agent-steps per second
+    summary = {}
+    for name in policies:
+        stats = [result['policies'][name] for result in results]
+        ratios = [s['steps'][0]/result['shortest']
+                  for s, result in zip(stats, results) if s['steps']]
+        summary[name] = {'solved'         : float(np.mean([s['solved'] for s in stats])),
+                         'medianRatio'    : float(np.median(ratios)) if ratios else None,
+                         'agentStepsPerS' : sum(s['agentSteps'] for s in stats)/sum(s['seconds'] for s in stats),
+                         }
+    return summary
+
+
+################################################################################
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='4D Maze bot swarm')
+    parser.add_argument('--size', default='5',
+                        help='maze size, N or AxBxCxD (default: %(default)s)')
+    parser.add_argument('--mazes', type=int, default=10,
+                        help='mazes in the batch (default: %(default)s)')
+    parser.add_argument('--agents', type=int, default=1000,
+                        help='agents per policy and maze (default: %(default)s)')
+    parser.add_argument('--policies', nargs='+', choices=list(POLICIES), default=list(POLICIES),
+                        help='policies to run (default: all)')
+    parser.add_argument('--max-steps', type=int, default=10000,
+                        help='steps before giving up (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the first maze (default: %(default)s)')
+    parser.add_argument('--out', metavar='PATH',
+                        help='write JSON results to PATH')
+    args = parser.parse_args(argv)
+
+    size = parseSize(args.size)
+    print('{} mazes of {}, {} agents per policy'.format(args.mazes, sizeName(size), args.agents))
+    print('{:<6}{:>9}  {:<8}{:>7}{:>8}{:>8}{:>8}{:>12}'.format(
+          'seed', 'shortest', 'policy', 'solved', 'p50', 'p90', 'max', 'M steps/s'))
+    results = runBatch(size, args.mazes, args.agents, args.policies, args.max_steps, args.seed)
+    summary = summarize(results, args.policies)
+    print()
+    print('{:<8}{:>8}{:>16}{:>12}'.format('policy', 'solved', 'steps/shortest', 'M steps/s'))
+    for name, stats in summary.items():
+        ratio = '{:16.1f}'.format(stats['medianRatio']) if stats['medianRatio'] else '{:>16}'.format('-')
+        print('{:<8}{:8.0%}{}{:12.2f}'.format(name, stats['solved'], ratio, stats['agentStepsPerS']/1e6))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'size': size, 'results': results, 'summary': summary}, f, indent=1)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Per-phase frame timing
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from functools import wraps
+import time
+# installed
+import numpy as np
+
+################################################################################
+# FRAME TIMING
+
+# timed phases, in overlay order
+PHASES = ('on_draw',
+          'update',
+          'generateMaze',
+          'generateGoal',
+          'generateCube',
+          'generateHint',
+          'generateTrail',
+          'generateMap',
+          'generateViews',
+          'generateOverview',
+          'drawMaze',
+          'drawGoal',
+          'drawCube',
+          'drawHint',
+          'drawTrail',
+          'drawMap',
+          'drawViews',
+          'drawOverview',
+          )
+PHASE_WIDTH = max(map(len, PHASES)) + 2 # phase column of timing reports
+TIMING_SAMPLES = 1024 # per phase
+TIMING_REFRESH = 0.5  # overlay refresh interval (seconds)
+
+
+class PhaseTimer:
+    # fixed-size ring buffer of durations (seconds) for each phase
+    def __init__(self, phases=PHASES, samples=TIMING_SAMPLES):
+        self.phases  = phases
+        self.index   = {phase:i for i, phase in enumerate(phases)}
+        self.samples = np.zeros((len(phases), samples))
+        self.count   = [0]*len(phases) # total recorded, ring position = count % samples
+        self.enabled = False
+
+
+    def record(self, phase, seconds):
+        i = self.index[phase]
+        self.samples[i, self.count[i] % self.samples.shape[1]] = seconds
+        self.count[i] += 1
+
+
+    def history(self, phase):
+        # recorded samples of a phase, oldest first
+        i = self.index[phase]
+        n = self.samples.shape[1]
+        if self.count[i] <= n:
+            return self.samples[i, :self.count[i]]
+        return np.roll(self.samples[i], -(self.count[i] % n))
+
+
+    def percentiles(self, phase, q=(50, 95, 99)):
+        history = self.history(phase)
+        if len(history) == 0:
+            return [0.0]*len(q)
+        return np.percentile(history, q)
+
+
+    def clear(self):
+        self.count = [0]*len(self.phases)
+
+
+    def exportCSV(self, path):
+        with open(path, 'w') as f:
+            f.write('phase,sample,seconds\n')
+            for phase in self.phases:
+                for n, seconds in enumerate(self.history(phase)):
+                    f.write('{},{},{:.9f}\n'.format(phase, n, seconds))
+
+
+def timed(phase):
+    # record a scene method's duration in self.timer while it is enabled
+    def decorator(function):
+        @wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if not self.timer.enabled:
+                return function(self, *args, **kwargs)
+            start = time.perf_counter()
+            result = function(self, *args, **kwargs)
+            self.timer.record(phase, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+"""
+Chrome trace-event spans (chrome://tracing, Perfetto)
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from contextlib import nullcontext
+from functools import wraps
+import atexit
+import json
+import os
+import threading
+import time
+
+################################################################################
+# TRACING
+
+TRACE_ENV = 'MAZE_TRACE'
+
+
+class Span:
+    # one complete ('X') trace event, nested spans are contained in time
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.tracer.events.append({'name' : self.name,
+                                   'cat'  : 'maze',
+                                   'ph'   : 'X',
+                                   'ts'   : (self.start - self.tracer.origin)*1e6,
+                                   'dur'  : (end - self.start)*1e6,
+                                   'pid'  : self.tracer.pid,
+                                   'tid'  : threading.get_ident(),
+                                   'args' : self.args,
+                                   })
+
+
+class Tracer:
+    # records spans only once started, written as Chrome trace-event JSON
+    def __init__(self, path=None):
+        self.enabled = False
+        self.events = []
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.disabled = nullcontext()
+        if path:
+            self.start(path)
+
+
+    def start(self, path):
+        if not self.enabled:
+            atexit.register(self.write)
+        self.path = path
+        self.enabled = True
+
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return self.disabled
+        return Span(self, name, args)
+
+
+    def write(self):
+        with open(self.path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+
+TRACER = Tracer(os.environ.get(TRACE_ENV))
+
+
+def traced(name):
+    # record a scene method as a trace span while the tracer is enabled
+    def decorator(function):
+        @wraps(function)
+        def wrapper(self, *args, **kwargs):
+            if not TRACER.enabled:
+                return function(self, *args, **kwargs)
+            with TRACER.span(name):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+"""
+Game actions driven through the keymap without a window
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# installed
+import numpy as np
+import pytest
+# local
+from maze4d.controls import DEFAULT_KEYMAP, HELD_ACTIONS, readKeymap
+from maze4d.openmask import openBit
+from maze4d.scene import MazeScene
+
+################################################################################
+# TESTS
+
+# actions only the windowed game handles, see maze4d.render
+WINDOW_ACTIONS = ('fullscreen', 'timing overlay', 'export timings')
+
+
+@pytest.fixture
+def scene():
+    return MazeScene(seed=1)
+
+
+def test_every_action_is_handled(scene):
+    for action in readKeymap():
+        assert action in scene.actions or action in HELD_ACTIONS or action in WINDOW_ACTIONS
+
+
+def test_keymap_file(tmp_path):
+    path = tmp_path / 'keys.ini'
+    path.write_text('[keys]\nx+ = UP, W\nnot an action = X\n')
+    keymap = readKeymap(str(path))
+    assert keymap['x+'] == ['UP', 'W']
+    assert keymap['x-'] == DEFAULT_KEYMAP['x-']
+    assert 'not an action' not in keymap
+
+
+def test_move(scene):
+    # every open direction of the start moves there, every closed one stays
+    start = np.array(scene.position)
+    for axis, name in enumerate('xyzw'):
+        for step, sign in ((+1, '+'), (-1, '-')):
+            scene.position = start.copy()
+            scene.doAction(name + sign)
+            expected = start.copy()
+            if scene.openMask[tuple(start)] & openBit(axis, step):
+                expected[axis] += step
+            assert (scene.position == expected).all()
+
+
+def test_dimension_swap(scene):
+    assert list(scene.d) == [0, 1, 2, 3]
+    scene.doAction('exclude x')
+    assert list(scene.d) == [3, 1, 2, 0]
+    scene.doAction('exclude z')
+    assert list(scene.d) == [3, 1, 0, 2]
+    # the hidden dimension stays hidden
+    scene.doAction('exclude z')
+    assert list(scene.d) == [3, 1, 0, 2]
+
+
+def test_cross_sections(scene):
+    assert scene.crossSection == 3
+    sections = []
+    for i in range(3):
+        scene.doAction('cross-sections')
+        sections.append(scene.crossSection)
+    assert sections == [2, 1, 3]
+    scene.doAction('previous cross-section')
+    assert scene.crossSection == 1
+
+
+def test_held_actions(scene):
+    scene.doAction('turn right')
+    assert scene.animating()
+    scene.releaseAction('turn right')
+    assert not scene.heldActions
+
+
+def test_undo(scene):
+    start = np.array(scene.position)
+    scene.doAction('exclude y')
+    scene.doAction('cross-sections')
+    scene.doAction('undo')
+    scene.doAction('undo')
+    assert list(scene.d) == [0, 1, 2, 3]
+    assert scene.crossSection == 3
+    assert (scene.position == start).all()
@@ -0,0 +1,43 @@
+"""
+Golden images of the renderer, see maze4d.golden
+
+Skipped where no GL context can be created, headless this needs EGL.
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+import os
+# installed
+import pytest
+# local, pyglet fails on import when DISPLAY names no display
+try:
+    from maze4d.golden import DEFAULT_DIR, GOLDEN_CASES, MAX_BAD_FRACTION, compareImages, fileName
+    from maze4d.offscreen import OffscreenRenderer, readPng
+except Exception as error:
+    pytest.skip('no GL: {!r}'.format(error), allow_module_level=True)
+
+################################################################################
+# TESTS
+
+@pytest.fixture(scope='module')
+def renderer():
+    try:
+        renderer = OffscreenRenderer()
+    except Exception as error:
+        pytest.skip('no GL context: {!r}'.format(error))
+    yield renderer
+    renderer.close()
+
+
+@pytest.mark.parametrize('case', list(GOLDEN_CASES))
+def test_golden(renderer, case):
+    path = os.path.join(DEFAULT_DIR, fileName(case))
+    assert os.path.exists(path), 'no reference, run python -m maze4d.golden --update'
+    image, sceneTime, drawTime = renderer.render(**GOLDEN_CASES[case])
+    bad, difference = compareImages(image, readPng(path))
+    assert bad <= MAX_BAD_FRACTION
@@ -0,0 +1,105 @@
+"""
+Undo and rewind over the history ring, and the breadcrumb trail
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from random import Random
+# installed
+import numpy as np
+# local
+from maze4d.history import History, Trail, MOVE, SWAP
+from maze4d.scene import MazeScene
+
+################################################################################
+# TESTS
+
+ACTIONS = ['x+', 'x-', 'y+', 'y-', 'z+', 'z-', 'w+', 'w-',
+           'exclude x', 'exclude y', 'exclude z', 'exclude w',
+           'cross-sections', 'previous cross-section']
+
+
+def state(scene):
+    return (tuple(scene.position), tuple(scene.d), scene.crossSection, scene.sliceW)
+
+
+def play(scene, count, seed=0):
+    # random actions, returns the state before each that was recorded,
+    # blocked moves and swaps to the hidden dimension are not
+    rng = Random(seed)
+    states = []
+    for i in range(count):
+        before = state(scene)
+        recorded = len(scene.history)
+        scene.doAction(rng.choice(ACTIONS))
+        if len(scene.history) > recorded:
+            states.append(before)
+    return states
+
+
+def test_ring():
+    history = History(3)
+    for value in range(5):
+        history.push(MOVE, value)
+    assert len(history) == 3
+    assert history.pop() == (MOVE, 4)
+    history.push(SWAP, 1)
+    assert history.popAll().tolist() == [[MOVE, 2], [MOVE, 3], [SWAP, 1]]
+    assert history.pop() is None
+
+
+def test_undo():
+    scene = MazeScene(size=(6, 6, 6, 6), seed=3)
+    states = play(scene, 200)
+    for before in states[::-1]:
+        scene.doAction('undo')
+        assert state(scene) == before
+    # nothing left to undo
+    scene.doAction('undo')
+    assert state(scene) == states[0]
+
+
+def test_rewind():
+    scene = MazeScene(size=(6, 6, 6, 6), seed=3)
+    start = state(scene)
+    play(scene, 200, seed=1)
+    scene.doAction('rewind')
+    assert state(scene) == start
+    assert not len(scene.history)
+    # the geometry is that of the restored view
+    vertices = scene.mazeVertices.copy()
+    scene.generateMaze()
+    assert np.array_equal(scene.mazeVertices, vertices)
+
+
+def test_trail_ring():
+    trail = Trail(3)
+    cells, ages = trail.recent()
+    assert len(cells) == 0
+    for i in range(5):
+        trail.push((i, 0, 0, 0))
+    cells, ages = trail.recent()
+    # newest first, the two oldest dropped
+    assert cells[:,0].tolist() == [4, 3, 2]
+    assert ages.tolist() == [0, 1, 2]
+    trail.clear()
+    assert len(trail) == 0
+
+
+def test_trail_moves():
+    scene = MazeScene(size=(6, 6, 6, 6), seed=3)
+    left = []
+    for action in ['x+', 'y+', 'z+', 'w+', 'x-', 'y-', 'z-', 'w-']*5:
+        position = tuple(scene.position)
+        scene.doAction(action)
+        if tuple(scene.position) != position:
+            left.append(position)
+    cells, ages = scene.trail.recent()
+    assert [tuple(cell) for cell in cells] == left[::-1]
+    scene.regenerate()
+    assert len(scene.trail) == 0
@@ -0,0 +1,40 @@
+"""
+Open mask kept current by setCell, against one built from scratch
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from random import Random
+# installed
+import numpy as np
+# local
+from maze4d.constants import BLOCK_BIT
+from maze4d.openmask import DIRECTIONS, buildOpenMask, openBit
+from maze4d.scene import MazeScene
+
+################################################################################
+# TESTS
+
+def test_bits():
+    # a free cell is open towards every free neighbor inside the maze
+    maze = np.zeros((3, 3, 3, 4), 'uint8')
+    maze[1, 1, 1, 2] = BLOCK_BIT
+    mask = buildOpenMask(maze)
+    assert mask[1, 1, 1, 1] == 0xff & ~openBit(3, +1)
+    assert mask[0, 0, 0, 0] == sum(openBit(axis, +1) for axis in range(4))
+    for axis, step in DIRECTIONS:
+        assert mask[1, 1, 1, 2] & openBit(axis, step)
+
+
+def test_set_cell():
+    scene = MazeScene(size=(4, 5, 3, 4), seed=2)
+    rng = Random(0)
+    for i in range(200):
+        cell = tuple(rng.randrange(n) for n in scene.maze.shape)
+        scene.setCell(cell, rng.random() < 0.5)
+        assert (scene.openMask == buildOpenMask(scene.maze)).all()
@@ -0,0 +1,63 @@
+"""
+Game-session server requests, without a socket
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# installed
+import numpy as np
+# local
+from maze4d.server import (MazeServer, REQUEST_DTYPE, RESPONSE_DTYPE, FRAME,
+                           NEW, STATE, OK, BAD_REQUEST)
+
+################################################################################
+# TESTS
+
+class Writer:
+    # stands in for an asyncio.StreamWriter
+    def __init__(self):
+        self.data = b''
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.data += data
+
+
+def newRequests(sizes):
+    requests = np.zeros(len(sizes), REQUEST_DTYPE)
+    requests['op'] = NEW
+    requests['tag'] = np.arange(len(sizes))
+    requests['size'] = sizes
+    return requests
+
+
+def test_bad_sizes():
+    # empty, too large and almost never solvable mazes are refused, the
+    # rest of the batch is still answered
+    server = MazeServer()
+    responses = server.respond(newRequests([(0, 5, 5, 5), (255, 255, 255, 255),
+                                            (40, 1, 1, 1), (5, 5, 5, 5)]))
+    assert list(responses['status']) == [BAD_REQUEST]*3 + [OK]
+    state = np.zeros(1, REQUEST_DTYPE)
+    state['op'] = STATE
+    state['session'] = responses['session'][3]
+    assert server.respond(state)['status'][0] == OK
+
+
+def test_failed_batch():
+    # every request of a failed batch still gets a response
+    server = MazeServer()
+    def fail(requests):
+        raise RuntimeError('failed')
+    server.respond = fail
+    writer = Writer()
+    server.pending = [(writer, newRequests([(5, 5, 5, 5)]*3))]
+    server.runBatch()
+    assert len(writer.data) == 3*FRAME
+    assert (np.frombuffer(writer.data, RESPONSE_DTYPE)['status'] == BAD_REQUEST).all()
@@ -0,0 +1,76 @@
+"""
+Shortest routes of every kernel backend against a plain breadth-first search
+
+USAGE:
+    python -m pytest tests
+"""
+
+################################################################################
+# INCLUDES
+
+# built-in
+from collections import deque
+# installed
+import numpy as np
+import pytest
+# local
+from maze4d import kernels
+from maze4d.openmask import DIRECTIONS
+from maze4d.scene import MazeScene
+
+################################################################################
+# TESTS
+
+def bfsLength(mask, start, goal):
+    # cells on a shortest route, both ends included, None if unreachable
+    start, goal = tuple(start), tuple(goal)
+    distance = {start: 1}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell == goal:
+            return distance[cell]
+        for bit, (axis, step) in enumerate(DIRECTIONS):
+            if mask[cell] >> bit & 1:
+                neighbor = list(cell)
+                neighbor[axis] += step
+                neighbor = tuple(neighbor)
+                if neighbor not in distance:
+                    distance[neighbor] = distance[cell] + 1
+                    queue.append(neighbor)
+    return None
+
+
+@pytest.fixture(params=list(kernels.BACKENDS))
+def backend(request):
+    previous = kernels.backend
+    kernels.setBackend(request.param)
+    yield request.param
+    kernels.setBackend(previous)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_shortest_path(backend, seed):
+    scene = MazeScene(size=(6, 6, 6, 4), seed=seed)
+    route = scene.shortestPath()
+    assert len(route) == bfsLength(scene.openMask, scene.position, scene.goal)
+    assert (route[0] == scene.position).all()
+    assert (route[-1] == scene.goal).all()
+    # every step is one open move
+    for cell, following in zip(route[:-1], route[1:]):
+        step = following - cell
+        assert np.abs(step).sum() == 1
+        axis = int(np.flatnonzero(step)[0])
+        assert scene.openMask[tuple(cell)] >> DIRECTIONS.index((axis, int(step[axis]))) & 1
+
+
+def test_unreachable(backend):
+    scene = MazeScene(seed=1)
+    scene.setCell(scene.goal, True)
+    for axis, step in DIRECTIONS:
+        neighbor = np.array(scene.goal)
+        neighbor[axis] += step
+        if 0 <= neighbor[axis] < scene.size[axis]:
+            scene.setCell(neighbor, True)
+    scene.setCell(scene.goal, False)
+    assert scene.shortestPath() is None